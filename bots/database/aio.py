@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import asyncio
+import sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable
+
+
+class AsyncSQLitePool:
+    """asyncio façade over SQLiteConnectionPool for Telegram handlers.
+
+    Reads run on a dedicated thread pool sized to the reader pool, so the
+    event loop never blocks on SQLite. Writes await the writer thread's
+    futures directly and need no extra thread. A cancelled handler never
+    leaks a connection: reads release inside the worker thread, and a
+    connection acquired after its caller was cancelled is released as soon
+    as it arrives.
+    """
+
+    def __init__(self, pool, max_workers: int | None = None) -> None:
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or pool.max_connections,
+            thread_name_prefix="sqlite-aio",
+        )
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def aquery(self, sql: str, params: tuple | None = None) -> list[sqlite3.Row]:
+        return await self._run(self.pool.query, sql, params)
+
+    async def aexecute(self, sql: str, params: tuple | None = None) -> int:
+        # Cancelling before the writer picks the job up drops the write;
+        # once it is running the write completes regardless.
+        return await asyncio.wrap_future(self.pool.execute_async(sql, params))
+
+    async def aexecute_many(self, sql: str, rows: Iterable[tuple]) -> int:
+        return await self._run(self.pool.execute_many, sql, list(rows))
+
+    @asynccontextmanager
+    async def aconnection(self, write: bool = False) -> AsyncIterator[sqlite3.Connection]:
+        loop = asyncio.get_running_loop()
+        pending = loop.run_in_executor(self._executor, self.pool.acquire, write)
+        try:
+            conn = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            pending.add_done_callback(self._release_when_acquired)
+            raise
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    def _release_when_acquired(self, future: asyncio.Future | Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.pool.release(future.result())
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
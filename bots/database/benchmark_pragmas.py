@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    from .db_manager import PRAGMA_PROFILES, SQLiteConnectionPool
+except ImportError:
+    from db_manager import PRAGMA_PROFILES, SQLiteConnectionPool
+
+
+INSERT_SQL = "INSERT INTO bench (user_id, bot_name, message) VALUES (?, ?, ?)"
+QUERY_SQL = "SELECT COUNT(*), MAX(id) FROM bench WHERE user_id = ?"
+
+
+def _create_table(pool: SQLiteConnectionPool) -> None:
+    pool.execute(
+        """
+        CREATE TABLE IF NOT EXISTS bench (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            bot_name TEXT NOT NULL,
+            message TEXT NOT NULL
+        )
+        """
+    )
+    pool.execute("CREATE INDEX IF NOT EXISTS idx_bench_user_id ON bench (user_id)")
+
+
+def _run_threads(threads: int, target) -> float:
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def bench_profile(
+    profile: str,
+    rows: int,
+    queries: int,
+    threads: int,
+    workdir: Path,
+    batch_size: int = 10,
+) -> dict:
+    db_path = workdir / f"bench_{profile}.db"
+    pool = SQLiteConnectionPool(db_path, max_connections=threads, profile=profile)
+    try:
+        _create_table(pool)
+        per_thread = rows // threads
+
+        def insert(worker: int) -> None:
+            # Commit straight on the writer connection rather than through the
+            # write queue, so the per-commit cost of each profile shows
+            for start in range(0, per_thread, batch_size):
+                chunk = [
+                    (f"user-{i % 50}", f"bot-{worker}", "x" * 120)
+                    for i in range(start, min(start + batch_size, per_thread))
+                ]
+                with pool.transaction() as conn:
+                    conn.executemany(INSERT_SQL, chunk)
+
+        def query(worker: int) -> None:
+            for i in range(queries // threads):
+                pool.query(QUERY_SQL, (f"user-{(worker + i) % 50}",))
+
+        insert_seconds = _run_threads(threads, insert)
+        query_seconds = _run_threads(threads, query)
+    finally:
+        pool.close()
+
+    inserted = per_thread * threads
+    run_queries = (queries // threads) * threads
+    return {
+        "profile": profile,
+        "inserts_per_sec": inserted / insert_seconds,
+        "queries_per_sec": run_queries / query_seconds,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure SQLite insert/query throughput under each pragma profile."
+    )
+    parser.add_argument("--rows", type=int, default=20000, help="Rows to insert per profile")
+    parser.add_argument("--queries", type=int, default=20000, help="Indexed lookups per profile")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent client threads")
+    parser.add_argument("--batch-size", type=int, default=10, help="Rows inserted per transaction")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        default=list(PRAGMA_PROFILES),
+        choices=list(PRAGMA_PROFILES),
+        help="Profiles to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--dir",
+        default=None,
+        help="Directory for benchmark databases (default: a temp dir, removed afterwards)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = Path(args.dir) if args.dir else Path(tempfile.mkdtemp(prefix="apex_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        print(
+            f"[benchmark] rows={args.rows} queries={args.queries} "
+            f"threads={args.threads} batch_size={args.batch_size}"
+        )
+        print(f"{'profile':<12}{'inserts/s':>14}{'queries/s':>14}")
+        for profile in args.profiles:
+            result = bench_profile(
+                profile, args.rows, args.queries, args.threads, workdir, args.batch_size
+            )
+            print(
+                f"{result['profile']:<12}"
+                f"{result['inserts_per_sec']:>14,.0f}"
+                f"{result['queries_per_sec']:>14,.0f}"
+            )
+    except Exception as exc:
+        print(f"[benchmark] ERROR: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if not args.dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5.0
+DEFAULT_IDLE_SECONDS = 2.0
+# RESTART once the WAL passes the budget, TRUNCATE once it passes budget * factor
+DEFAULT_WAL_BUDGET_BYTES = 64 * 1024 * 1024
+DEFAULT_TRUNCATE_FACTOR = 4
+# RESTART/TRUNCATE wait on readers while holding the write lock; keep it short
+DEFAULT_BUSY_TIMEOUT_MS = 100
+HISTORY_SIZE = 100
+
+
+class WalCheckpointer:
+    """Background thread that keeps the WAL file bounded.
+
+    PASSIVE checkpoints run whenever the database has been idle (no readers
+    checked out, no queued writes, no recent commit). If the WAL still grows
+    past the size budget - typically because long readers pin old snapshots -
+    it escalates to RESTART, and to TRUNCATE past budget * truncate_factor.
+    Write connections set journal_size_limit to the budget, so once a RESTART
+    lets the log wrap, SQLite also shrinks the file back under the budget.
+
+    Checkpoints run on a dedicated connection with a short busy_timeout, so
+    an escalated checkpoint never ties up the writer connection and gives up
+    quickly instead of stalling writers behind a long reader.
+    """
+
+    def __init__(
+        self,
+        pool,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        wal_budget_bytes: int = DEFAULT_WAL_BUDGET_BYTES,
+        truncate_factor: int = DEFAULT_TRUNCATE_FACTOR,
+        busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+    ) -> None:
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.idle_seconds = idle_seconds
+        self.wal_budget_bytes = wal_budget_bytes
+        self.truncate_factor = truncate_factor
+        self.busy_timeout_ms = busy_timeout_ms
+        self.wal_path = f"{pool.db_path}-wal"
+        self.history: deque[dict] = deque(maxlen=HISTORY_SIZE)
+        self.counts = {"PASSIVE": 0, "RESTART": 0, "TRUNCATE": 0}
+        self.failures = 0
+        # The WAL file keeps its size when SQLite rewrites it from the start,
+        # so "nothing to do" is decided from data_version (moves when another
+        # connection commits) and whether the last checkpoint copied every frame
+        self._conn: sqlite3.Connection | None = None
+        self._data_version: int | None = None
+        self._caught_up = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def wal_size(self) -> int:
+        try:
+            return os.path.getsize(self.wal_path)
+        except OSError:
+            return 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                str(self.pool.db_path),
+                timeout=self.busy_timeout_ms / 1000,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)};")
+        return self._conn
+
+    def _has_new_writes(self) -> bool:
+        version = self._connection().execute("PRAGMA data_version;").fetchone()[0]
+        return version != self._data_version
+
+    def checkpoint(self, mode: str) -> tuple[int, int, int]:
+        row = self._connection().execute(f"PRAGMA wal_checkpoint({mode});").fetchone()
+        return tuple(row)
+
+    def _is_idle(self) -> bool:
+        return (
+            self.pool.active_readers() == 0
+            and self.pool.pending_writes() == 0
+            and time.monotonic() - self.pool.last_write_at() >= self.idle_seconds
+        )
+
+    def choose_mode(self, wal_size: int) -> str | None:
+        if not wal_size or (self._caught_up and not self._has_new_writes()):
+            return None
+        if wal_size > self.wal_budget_bytes * self.truncate_factor:
+            return "TRUNCATE"
+        if wal_size > self.wal_budget_bytes:
+            return "RESTART"
+        if self._is_idle():
+            return "PASSIVE"
+        return None
+
+    def run_once(self) -> dict | None:
+        wal_before = self.wal_size()
+        mode = self.choose_mode(wal_before)
+        if mode is None:
+            return None
+
+        started = time.perf_counter()
+        try:
+            version = self._connection().execute("PRAGMA data_version;").fetchone()[0]
+            busy, log_frames, checkpointed = self.checkpoint(mode)
+        except Exception as exc:
+            self.failures += 1
+            logger.error(f"WAL checkpoint ({mode}) failed: {exc}")
+            return None
+        duration = time.perf_counter() - started
+
+        wal_after = self.wal_size()
+        self._data_version = version
+        self._caught_up = not busy and checkpointed == log_frames
+        record = {
+            "mode": mode,
+            "duration": duration,
+            "busy": busy,
+            "log_frames": log_frames,
+            "checkpointed_frames": checkpointed,
+            "wal_bytes_before": wal_before,
+            "wal_bytes_after": wal_after,
+            "at": time.time(),
+        }
+        self.counts[mode] += 1
+        self.history.append(record)
+        if mode != "PASSIVE":
+            logger.warning(
+                f"WAL at {wal_before / 1048576:.1f} MiB exceeded budget; "
+                f"{mode} checkpoint took {duration * 1000:.0f} ms (busy={busy})"
+            )
+        return record
+
+    def stats(self) -> dict:
+        durations = sorted(r["duration"] for r in self.history)
+        return {
+            "wal_bytes": self.wal_size(),
+            "counts": dict(self.counts),
+            "failures": self.failures,
+            "last": self.history[-1] if self.history else None,
+            "max_duration": durations[-1] if durations else 0.0,
+            "p50_duration": durations[len(durations) // 2] if durations else 0.0,
+        }
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="wal-checkpointer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.run_once()
@@ -2,14 +2,69 @@
 import os
 import sqlite3
 import threading
+import time
+from concurrent.futures import Future
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterable, Iterator
 from queue import Queue, Empty
 
+try:
+    from .aio import AsyncSQLitePool
+    from .checkpointer import WalCheckpointer
+    from .kv_store import SystemStateStore
+    from .retention import DEFAULT_RUN_INTERVAL, ConversationRetention, RetentionScheduler
+    from .stats import DEFAULT_SLOW_QUERY_MS, PoolStats, run_with_busy_retry
+    from .writer import SQLiteWriter, WriteJob
+except ImportError:
+    from aio import AsyncSQLitePool
+    from checkpointer import WalCheckpointer
+    from kv_store import SystemStateStore
+    from retention import DEFAULT_RUN_INTERVAL, ConversationRetention, RetentionScheduler
+    from stats import DEFAULT_SLOW_QUERY_MS, PoolStats, run_with_busy_retry
+    from writer import SQLiteWriter, WriteJob
+
 
 DEFAULT_DB_PATH = "/data/apex.db"
 DEFAULT_POOL_SIZE = 10
+DEFAULT_WRITER_POOL_SIZE = 1
+# Per-connection prepared statement cache (sqlite3 default is 128)
+DEFAULT_STATEMENT_CACHE_SIZE = 512
+DEFAULT_FETCH_SIZE = 500
 MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+DEFAULT_PRAGMA_PROFILE = "balanced"
+# WAL file is truncated back to this size when the log is reset after a checkpoint
+DEFAULT_JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+# Connection-level tuning. cache_size is negative KiB, mmap_size is bytes,
+# busy_timeout is milliseconds.
+PRAGMA_PROFILES: dict[str, dict[str, str | int]] = {
+    # fsync on every commit; survives power loss without losing commits
+    "durable": {
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 30000,
+    },
+    # WAL + NORMAL: no corruption risk, may lose the last commits on power loss
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    # Imports and backfills that can be re-run if the host crashes
+    "bulk_load": {
+        "synchronous": "OFF",
+        "cache_size": -256000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 60000,
+    },
+}
+_PRAGMA_ORDER = ("synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
 
 
 def _resolve_db_path(db_path: str) -> Path:
@@ -21,9 +76,31 @@ def _ensure_parent_dir(db_path: Path) -> None:
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def _apply_pragmas(conn: sqlite3.Connection) -> None:
+def _resolve_profile(profile: str | dict | None) -> dict[str, str | int]:
+    if profile is None:
+        profile = os.getenv("DATABASE_PRAGMA_PROFILE", DEFAULT_PRAGMA_PROFILE)
+    if isinstance(profile, dict):
+        unknown = set(profile) - set(_PRAGMA_ORDER)
+        if unknown:
+            raise ValueError(f"Unsupported pragma(s): {', '.join(sorted(unknown))}")
+        return profile
+    try:
+        return PRAGMA_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown pragma profile: {profile}") from None
+
+
+def _apply_profile(conn: sqlite3.Connection, profile: dict[str, str | int]) -> None:
+    for name in _PRAGMA_ORDER:
+        if name in profile:
+            conn.execute(f"PRAGMA {name}={profile[name]};")
+
+
+def _apply_pragmas(conn: sqlite3.Connection, profile: dict[str, str | int] | None = None) -> None:
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA wal_autocheckpoint=1000;")
+    conn.execute(f"PRAGMA journal_size_limit={DEFAULT_JOURNAL_SIZE_LIMIT};")
+    _apply_profile(conn, profile or _resolve_profile(None))
 
 
 def _init_schema(conn: sqlite3.Connection) -> None:
@@ -44,23 +121,93 @@ def _applied_migrations(conn: sqlite3.Connection) -> set[str]:
     return {row[0] for row in rows}
 
 
+def _split_statements(sql: str) -> list[str]:
+    # executescript() would COMMIT the surrounding transaction, so migrations
+    # are run statement by statement instead
+    statements = []
+    buffer = ""
+    for line in sql.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    remainder = "\n".join(
+        line for line in buffer.splitlines() if not line.strip().startswith("--")
+    ).strip()
+    if remainder:
+        raise ValueError(f"Incomplete SQL statement in migration: {remainder[:80]}")
+    return statements
+
+
 def _apply_migration(conn: sqlite3.Connection, name: str, sql: str) -> None:
-    conn.executescript(sql)
+    for statement in _split_statements(sql):
+        conn.execute(statement)
     conn.execute("INSERT INTO migrations (name) VALUES (?)", (name,))
 
 
-def apply_migrations(conn: sqlite3.Connection, migrations_dir: Path = MIGRATIONS_DIR) -> None:
+def apply_migrations(conn: sqlite3.Connection, migrations_dir: Path = MIGRATIONS_DIR) -> list[str]:
     if not migrations_dir.exists():
-        return
+        return []
 
-    applied = _applied_migrations(conn)
     migration_files = sorted(migrations_dir.glob("*.sql"))
-    for path in migration_files:
-        name = path.name
-        if name in applied:
-            continue
-        sql = path.read_text(encoding="utf-8")
-        _apply_migration(conn, name, sql)
+    # BEGIN IMMEDIATE takes SQLite's write lock, so when several containers
+    # start together one applies the migrations and the rest wait, then see
+    # them as already applied.
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        applied = _applied_migrations(conn)
+        newly_applied = []
+        for path in migration_files:
+            name = path.name
+            if name in applied:
+                continue
+            sql = path.read_text(encoding="utf-8")
+            _apply_migration(conn, name, sql)
+            newly_applied.append(name)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    return newly_applied
+
+
+class _BoundedPool:
+    def __init__(self, factory, max_size: int) -> None:
+        self._factory = factory
+        self.max_size = max_size
+        self._idle: Queue[sqlite3.Connection] = Queue(max_size)
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        return self.checkout()[0]
+
+    def checkout(self) -> tuple[sqlite3.Connection, bool]:
+        # Second item tells whether the caller had to wait for a free connection
+        try:
+            return self._idle.get_nowait(), False
+        except Empty:
+            with self._lock:
+                if self._created < self.max_size:
+                    conn = self._factory()
+                    self._created += 1
+                    return conn, False
+        return self._idle.get(), True
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        self._idle.put(conn)
+
+    def in_use(self) -> int:
+        return self._created - self._idle.qsize()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
 
 
 class SQLiteConnectionPool:
@@ -69,80 +216,287 @@ class SQLiteConnectionPool:
         db_path: str | Path,
         max_connections: int = DEFAULT_POOL_SIZE,
         timeout: float = 30.0,
+        max_writers: int = DEFAULT_WRITER_POOL_SIZE,
+        read_only_uri: bool = False,
+        profile: str | dict | None = None,
+        auto_checkpoint: bool = False,
+        slow_query_ms: float | None = None,
+        auto_retention: bool = False,
     ) -> None:
         self.db_path = _resolve_db_path(str(db_path))
+        # max_connections sizes the reader pool; writers are sized separately
         self.max_connections = max_connections
+        self.max_writers = max_writers
         self.timeout = timeout
-        self._pool: Queue[sqlite3.Connection] = Queue(max_connections)
-        self._created = 0
-        self._lock = threading.Lock()
+        self.read_only_uri = read_only_uri
+        self.profile = _resolve_profile(profile)
+        self._writers = _BoundedPool(self._create_writer_connection, max_writers)
+        self._readers = _BoundedPool(self._create_reader_connection, max_connections)
+        self._writer_ids: set[int] = set()
+        self._checked_out: dict[int, float] = {}
+        # Tracks threads inside transaction(), which holds a writer connection
+        self._local = threading.local()
+        if slow_query_ms is None:
+            slow_query_ms = float(os.getenv("DATABASE_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS))
+        self.stats = PoolStats(slow_query_ms=slow_query_ms)
         _ensure_parent_dir(self.db_path)
 
-        conn = self._create_connection()
+        # Schema must exist (and WAL be enabled) before any reader opens
+        conn = self._writers.acquire()
         try:
-            _apply_pragmas(conn)
             apply_migrations(conn)
-            conn.commit()
         finally:
-            self._pool.put(conn)
-            self._created = 1
+            self._writers.release(conn)
+
+        # Writes are queued to one thread drawing from the writer pool, so
+        # bots never contend on SQLite's write lock.
+        self._writer = SQLiteWriter(
+            lambda: self.acquire(write=True),
+            self.release,
+            begin=self._begin_immediate,
+        )
+
+        self._aio: AsyncSQLitePool | None = None
+        self._lazy_lock = threading.Lock()
+        self._system_state: SystemStateStore | None = None
 
-    def _create_connection(self) -> sqlite3.Connection:
+        self.checkpointer: WalCheckpointer | None = None
+        if auto_checkpoint:
+            self.start_checkpointer()
+
+        self.retention_scheduler: RetentionScheduler | None = None
+        if auto_retention:
+            self.start_retention_scheduler()
+
+    def _connect(self, database: str, uri: bool = False) -> sqlite3.Connection:
         conn = sqlite3.connect(
-            str(self.db_path),
+            database,
             timeout=self.timeout,
             check_same_thread=False,
+            uri=uri,
+            cached_statements=DEFAULT_STATEMENT_CACHE_SIZE,
         )
         conn.row_factory = sqlite3.Row
-        _apply_pragmas(conn)
+        return conn
+
+    def _create_writer_connection(self) -> sqlite3.Connection:
+        conn = self._connect(str(self.db_path))
+        _apply_pragmas(conn, self.profile)
+        # Transactions on write connections are always explicit
+        conn.isolation_level = None
+        self._writer_ids.add(id(conn))
+        return conn
+
+    def _create_reader_connection(self) -> sqlite3.Connection:
+        if self.read_only_uri:
+            conn = self._connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+            _apply_profile(conn, self.profile)
+        else:
+            conn = self._connect(str(self.db_path))
+            _apply_pragmas(conn, self.profile)
+        conn.execute("PRAGMA query_only=ON;")
+        # No implicit BEGIN: a stray DML statement must not leave the reader
+        # pinned to an old snapshot
+        conn.isolation_level = None
         return conn
 
     @contextmanager
-    def connection(self) -> sqlite3.Connection:
-        conn = self.acquire()
+    def connection(
+        self,
+        write: bool = False,
+        profile: str | dict | None = None,
+    ) -> sqlite3.Connection:
+        conn = self.acquire(write=write)
+        override = _resolve_profile(profile) if profile is not None else None
         try:
+            if override is not None:
+                _apply_profile(conn, override)
             yield conn
         finally:
+            if override is not None:
+                # Pooled connections always go back with the pool's profile
+                _apply_profile(conn, self.profile)
             self.release(conn)
 
-    def acquire(self) -> sqlite3.Connection:
-        try:
-            return self._pool.get_nowait()
-        except Empty:
-            with self._lock:
-                if self._created < self.max_connections:
-                    conn = self._create_connection()
-                    self._created += 1
-                    return conn
-        return self._pool.get()
+    def _check_not_in_transaction(self) -> None:
+        # With the writer pool exhausted by transaction(), queued writes or a
+        # second writer checkout from the same thread would wait forever
+        if getattr(self._local, "in_transaction", False):
+            raise RuntimeError(
+                "Cannot queue writes or check out a writer inside pool.transaction(); "
+                "use the connection it yields"
+            )
+
+    def acquire(self, write: bool = False) -> sqlite3.Connection:
+        if write:
+            self._check_not_in_transaction()
+        side = "writer" if write else "reader"
+        started = time.perf_counter()
+        conn, waited = (self._writers if write else self._readers).checkout()
+        now = time.perf_counter()
+        self.stats.record_acquire(side, now - started, waited)
+        self._checked_out[id(conn)] = now
+        return conn
 
     def release(self, conn: sqlite3.Connection) -> None:
-        self._pool.put(conn)
+        is_writer = id(conn) in self._writer_ids
+        checked_out = self._checked_out.pop(id(conn), None)
+        if checked_out is not None:
+            self.stats.record_hold("writer" if is_writer else "reader", time.perf_counter() - checked_out)
+        if conn.in_transaction:
+            # Never hand out a connection mid-transaction (stale snapshot or
+            # half-done writes)
+            conn.rollback()
+        if is_writer:
+            self._writers.release(conn)
+        else:
+            self._readers.release(conn)
+
+    def _begin_immediate(self, conn: sqlite3.Connection) -> None:
+        # busy_timeout already waits; this only covers the rare timeout expiry
+        run_with_busy_retry(
+            lambda: conn.execute("BEGIN IMMEDIATE"),
+            on_retry=self.stats.record_busy_retry,
+        )
 
-    def execute(self, sql: str, params: tuple | None = None) -> None:
+    def _timed(self, sql: str, job: WriteJob) -> WriteJob:
+        def run(conn: sqlite3.Connection):
+            started = time.perf_counter()
+            try:
+                return job(conn)
+            finally:
+                self.stats.record_query(sql, time.perf_counter() - started)
+        return run
+
+    def submit_write(self, job: WriteJob) -> Future:
+        self._check_not_in_transaction()
+        return self._writer.submit(job)
+
+    def execute_async(self, sql: str, params: tuple | None = None) -> Future:
         params = params or ()
-        with self.connection() as conn:
-            conn.execute(sql, params)
-            conn.commit()
+        return self.submit_write(
+            self._timed(sql, lambda conn: conn.execute(sql, params).rowcount)
+        )
+
+    def execute(self, sql: str, params: tuple | None = None) -> None:
+        self.execute_async(sql, params).result()
+
+    def execute_many(self, sql: str, rows: Iterable[tuple]) -> int:
+        return self.submit_write(
+            self._timed(sql, lambda conn: conn.executemany(sql, rows).rowcount)
+        ).result()
+
+    @contextmanager
+    def transaction(self, profile: str | dict | None = None) -> Iterator[sqlite3.Connection]:
+        with self.connection(write=True, profile=profile) as conn:
+            self._begin_immediate(conn)
+            self._local.in_transaction = True
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._local.in_transaction = False
+            conn.execute("COMMIT")
 
     def query(self, sql: str, params: tuple | None = None) -> list[sqlite3.Row]:
         params = params or ()
         with self.connection() as conn:
-            cursor = conn.execute(sql, params)
-            return cursor.fetchall()
+            started = time.perf_counter()
+            rows = run_with_busy_retry(
+                lambda: conn.execute(sql, params).fetchall(),
+                on_retry=self.stats.record_busy_retry,
+            )
+            self.stats.record_query(sql, time.perf_counter() - started)
+            return rows
+
+    def iter_query(
+        self,
+        sql: str,
+        params: tuple | None = None,
+        batch_size: int = DEFAULT_FETCH_SIZE,
+    ) -> Iterator[sqlite3.Row]:
+        # The reader connection is held until the generator is exhausted or closed
+        params = params or ()
+        with self.connection() as conn:
+            started = time.perf_counter()
+            cursor = run_with_busy_retry(
+                lambda: conn.execute(sql, params),
+                on_retry=self.stats.record_busy_retry,
+            )
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+                self.stats.record_query(sql, time.perf_counter() - started)
+
+    @property
+    def aio(self) -> AsyncSQLitePool:
+        with self._lazy_lock:
+            if self._aio is None:
+                self._aio = AsyncSQLitePool(self)
+            return self._aio
+
+    @property
+    def system_state(self) -> SystemStateStore:
+        with self._lazy_lock:
+            if self._system_state is None:
+                self._system_state = SystemStateStore(self)
+            return self._system_state
+
+    async def aquery(self, sql: str, params: tuple | None = None) -> list[sqlite3.Row]:
+        return await self.aio.aquery(sql, params)
+
+    async def aexecute(self, sql: str, params: tuple | None = None) -> int:
+        return await self.aio.aexecute(sql, params)
 
     def mark_conversation_history_for_deletion(self, days: int = 90) -> int:
-        sql = """
-            UPDATE conversation_history
-            SET marked_for_deletion_at = CURRENT_TIMESTAMP
-            WHERE created_at < datetime('now', ?)
-              AND marked_for_deletion_at IS NULL
-        """
-        cutoff = f"-{days} days"
-        with self.connection() as conn:
-            cursor = conn.execute(sql, (cutoff,))
-            conn.commit()
-            return cursor.rowcount
+        return ConversationRetention(self, retention_days=days).mark()
+
+    def purge_conversation_history(self, purge_after_days: int = 30) -> int:
+        return ConversationRetention(self, purge_after_days=purge_after_days).purge()
+
+    def start_retention_scheduler(
+        self,
+        interval: float = DEFAULT_RUN_INTERVAL,
+        **retention_options,
+    ) -> RetentionScheduler:
+        if self.retention_scheduler is None:
+            retention = ConversationRetention(self, **retention_options)
+            self.retention_scheduler = RetentionScheduler(retention, interval=interval)
+            self.retention_scheduler.start()
+        return self.retention_scheduler
+
+    def get_stats(self, top: int = 20) -> dict:
+        snapshot = self.stats.snapshot(top=top)
+        snapshot["saturation"] = {
+            "readers_in_use": self._readers.in_use(),
+            "readers_max": self.max_connections,
+            "writers_in_use": self._writers.in_use(),
+            "writers_max": self.max_writers,
+            "pending_writes": self._writer.pending(),
+        }
+        return snapshot
+
+    def active_readers(self) -> int:
+        return self._readers.in_use()
+
+    def pending_writes(self) -> int:
+        return self._writer.pending()
+
+    def last_write_at(self) -> float:
+        return self._writer.last_commit_at
+
+    def start_checkpointer(self, **options) -> WalCheckpointer:
+        if self.checkpointer is None:
+            self.checkpointer = WalCheckpointer(self, **options)
+            self.checkpointer.start()
+        return self.checkpointer
 
     def checkpoint(self, mode: str = "PASSIVE") -> tuple[int, int, int]:
         allowed = {"PASSIVE", "FULL", "RESTART", "TRUNCATE"}
@@ -150,17 +504,55 @@ class SQLiteConnectionPool:
         if mode not in allowed:
             raise ValueError(f"Unsupported checkpoint mode: {mode}")
         sql = f"PRAGMA wal_checkpoint({mode});"
-        with self.connection() as conn:
+        with self.connection(write=True) as conn:
             row = conn.execute(sql).fetchone()
             return tuple(row)
 
+    def close(self) -> None:
+        if self._aio:
+            self._aio.close()
+        if self._system_state:
+            self._system_state.close()
+        if self.checkpointer:
+            self.checkpointer.stop()
+        if self.retention_scheduler:
+            self.retention_scheduler.stop()
+        self._writer.close()
+        self._writers.close()
+        self._readers.close()
+
 
 def init_pool(
     db_path: str | Path | None = None,
     max_connections: int = DEFAULT_POOL_SIZE,
+    max_writers: int = DEFAULT_WRITER_POOL_SIZE,
+    profile: str | dict | None = None,
+    auto_checkpoint: bool = True,
+    slow_query_ms: float | None = None,
+    auto_retention: bool = False,
 ) -> SQLiteConnectionPool:
     db_path = db_path or os.getenv("DATABASE_PATH", DEFAULT_DB_PATH)
-    return SQLiteConnectionPool(db_path=db_path, max_connections=max_connections)
+    return SQLiteConnectionPool(
+        db_path=db_path,
+        max_connections=max_connections,
+        max_writers=max_writers,
+        profile=profile,
+        auto_checkpoint=auto_checkpoint,
+        slow_query_ms=slow_query_ms,
+        auto_retention=auto_retention,
+    )
+
+
+_pool_instance: SQLiteConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SQLiteConnectionPool:
+    global _pool_instance
+    with _pool_lock:
+        if _pool_instance is None:
+            _pool_instance = init_pool()
+        return _pool_instance
 
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Mapping
+
+
+DEFAULT_CACHE_SIZE = 1024
+# Stay well under SQLite's bound-parameter limit
+MAX_KEYS_PER_QUERY = 500
+
+_MISSING = object()
+
+_UPSERT_SQL = """
+    INSERT INTO system_state (key, value, updated_at)
+    VALUES (?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(key) DO UPDATE SET
+        value = excluded.value,
+        updated_at = excluded.updated_at
+"""
+_VERSION_SQL = "SELECT version FROM system_state_version WHERE id = 1"
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value)
+
+
+def _decode(raw: str | None) -> Any:
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        # Rows written before values were JSON-encoded
+        return raw
+
+
+class SystemStateStore:
+    """Typed key-value API over the system_state table with a read-through LRU.
+
+    Values are stored JSON-encoded, so ints, floats, bools, lists and dicts
+    round-trip. Writes go through the pool's writer and update the cache
+    immediately. Changes made by other processes are detected with
+    PRAGMA data_version on a private connection (a no-I/O check); only when
+    it moves is the trigger-maintained system_state_version row read, and
+    the cache is cleared if someone other than us changed system_state.
+    """
+
+    def __init__(self, pool, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.pool = pool
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every write and invalidation; a read-through only caches
+        # what it loaded if nothing changed while the query ran
+        self._generation = 0
+        # data_version is per connection, so watch through one we own
+        self._watch = sqlite3.connect(
+            f"{pool.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        self._data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        self._known_version = self._watch.execute(_VERSION_SQL).fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _sync(self) -> None:
+        with self._lock:
+            data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            version = self._watch.execute(_VERSION_SQL).fetchone()[0]
+            if version != self._known_version:
+                self._known_version = version
+                self._clear_locked()
+
+    def _clear_locked(self) -> None:
+        self._cache.clear()
+        self._generation += 1
+        self.invalidations += 1
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get(self, key: str, default: Any = None, cast: Callable[[Any], Any] | None = None) -> Any:
+        self._sync()
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            generation = self._generation
+        if value is _MISSING:
+            rows = self.pool.query("SELECT value FROM system_state WHERE key = ?", (key,))
+            value = _decode(rows[0][0]) if rows else None
+            with self._lock:
+                self.misses += 1
+                if generation == self._generation:
+                    self._remember(key, value)
+        if value is None:
+            return default
+        return cast(value) if cast else value
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        self._sync()
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, Any] = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                value = self._cache.get(key, _MISSING)
+                if value is _MISSING:
+                    missing.append(key)
+                else:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    found[key] = value
+            generation = self._generation
+
+        for start in range(0, len(missing), MAX_KEYS_PER_QUERY):
+            chunk = missing[start:start + MAX_KEYS_PER_QUERY]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.pool.query(
+                f"SELECT key, value FROM system_state WHERE key IN ({placeholders})",
+                tuple(chunk),
+            )
+            loaded = {row[0]: _decode(row[1]) for row in rows}
+            with self._lock:
+                self.misses += len(chunk)
+                fresh = generation == self._generation
+                for key in chunk:
+                    value = loaded.get(key)
+                    if fresh:
+                        self._remember(key, value)
+                    found[key] = value
+
+        return {key: found[key] for key in keys if found.get(key) is not None}
+
+    def _write(self, apply: Callable[[sqlite3.Connection], None], updates: Mapping[str, Any]) -> None:
+        def job(conn: sqlite3.Connection) -> tuple[int, int]:
+            # The writer holds the write lock, so nothing can commit between
+            # these two reads and the difference is exactly our change
+            before = conn.execute(_VERSION_SQL).fetchone()[0]
+            apply(conn)
+            after = conn.execute(_VERSION_SQL).fetchone()[0]
+            return before, after
+
+        before, after = self.pool.submit_write(job).result()
+        with self._lock:
+            if before != self._known_version:
+                # Someone else wrote since we last looked
+                self._clear_locked()
+            self._known_version = after
+            self._generation += 1
+            for key, value in updates.items():
+                self._remember(key, value)
+
+    def set(self, key: str, value: Any) -> None:
+        self._write(lambda conn: conn.execute(_UPSERT_SQL, (key, _encode(value))), {key: value})
+
+    def set_many(self, items: Mapping[str, Any]) -> None:
+        if not items:
+            return
+        rows = [(key, _encode(value)) for key, value in items.items()]
+        self._write(lambda conn: conn.executemany(_UPSERT_SQL, rows), items)
+
+    def delete(self, key: str) -> None:
+        self._write(
+            lambda conn: conn.execute("DELETE FROM system_state WHERE key = ?", (key,)),
+            {key: None},
+        )
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def close(self) -> None:
+        self._watch.close()
@@ -0,0 +1,5 @@
+-- Supports chunked purging of rows marked by the retention job
+
+CREATE INDEX IF NOT EXISTS idx_conversation_marked_for_deletion
+    ON conversation_history (marked_for_deletion_at)
+    WHERE marked_for_deletion_at IS NOT NULL;
@@ -0,0 +1,65 @@
+-- Tables previously created by bots/shared/db_init.py, execution/scripts/init_db.py
+-- and ad hoc in procurement_scanner._log_hit, plus indexes for their hot lookups
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    telegram_id INTEGER UNIQUE,
+    username TEXT,
+    full_name TEXT,
+    role TEXT DEFAULT 'user', -- 'admin', 'user'
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    bot_name TEXT,
+    command TEXT,
+    raw_input TEXT,
+    response_summary TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+
+-- Audit queries filter by bot and time range
+CREATE INDEX IF NOT EXISTS idx_interactions_bot_name_timestamp
+    ON interactions (bot_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_timestamp
+    ON interactions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_user_id
+    ON interactions (user_id);
+CREATE INDEX IF NOT EXISTS idx_interactions_command
+    ON interactions (command);
+
+CREATE TABLE IF NOT EXISTS system_state (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS apex_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+INSERT OR IGNORE INTO apex_meta (key, value) VALUES ('schema_version', '1');
+
+CREATE TABLE IF NOT EXISTS procurement_matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    form_470_id TEXT,
+    applicant_name TEXT,
+    state TEXT,
+    service_type TEXT,
+    posted_date TEXT,
+    sfdc_account_id TEXT,
+    is_territory BOOLEAN,
+    scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_procurement_form_470_id
+    ON procurement_matches (form_470_id);
+CREATE INDEX IF NOT EXISTS idx_procurement_state_scanned_at
+    ON procurement_matches (state, scanned_at);
+CREATE INDEX IF NOT EXISTS idx_procurement_sfdc_account_id
+    ON procurement_matches (sfdc_account_id);
@@ -0,0 +1,27 @@
+-- Change counter for system_state, used by the in-process KV cache to tell
+-- its own writes apart from other processes' writes
+
+CREATE TABLE IF NOT EXISTS system_state_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO system_state_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_system_state_insert_version
+AFTER INSERT ON system_state
+BEGIN
+    UPDATE system_state_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_system_state_update_version
+AFTER UPDATE ON system_state
+BEGIN
+    UPDATE system_state_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_system_state_delete_version
+AFTER DELETE ON system_state
+BEGIN
+    UPDATE system_state_version SET version = version + 1 WHERE id = 1;
+END;
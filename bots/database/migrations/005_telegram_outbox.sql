@@ -0,0 +1,26 @@
+-- Durable outbound Telegram queue (execution/bots/shared/outbox.py).
+-- Rows are scoped by bot (a hash of the bot token) because every bot shares
+-- this database; a sender only ever claims its own bot's messages.
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bot TEXT NOT NULL,
+    chat_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    parse_mode TEXT,
+    reply_markup TEXT,
+    collapse_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    claimed_at REAL,
+    last_error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_pending
+    ON outbox (bot, status, chat_id, id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_outbox_collapse
+    ON outbox (bot, chat_id, collapse_key)
+    WHERE status = 'pending' AND collapse_key IS NOT NULL;
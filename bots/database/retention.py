@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+import logging
+import threading
+import time
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_PURGE_AFTER_DAYS = 30
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CHUNK_PAUSE = 0.05
+DEFAULT_RUN_INTERVAL = 24 * 60 * 60
+
+# (phase, rows_affected_so_far, ids_scanned, id_span)
+ProgressCallback = Callable[[str, int, int, int], None]
+
+
+class ConversationRetention:
+    """Marks and purges old conversation_history rows in bounded chunks.
+
+    Each chunk is one short write transaction over the next chunk_size
+    matching ids (keyset pagination on id), with a pause between chunks so
+    other writers get the lock in between. The cutoff is
+    fixed when a pass starts so every chunk uses the same boundary.
+    """
+
+    def __init__(
+        self,
+        pool,
+        retention_days: int = DEFAULT_RETENTION_DAYS,
+        purge_after_days: int = DEFAULT_PURGE_AFTER_DAYS,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pause: float = DEFAULT_CHUNK_PAUSE,
+        progress: ProgressCallback | None = None,
+    ) -> None:
+        self.pool = pool
+        self.retention_days = retention_days
+        self.purge_after_days = purge_after_days
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.progress = progress or _log_progress
+
+    def _cutoff(self, days: int) -> str:
+        row = self.pool.query("SELECT datetime('now', ?)", (f"-{days} days",))
+        return row[0][0]
+
+    def _run_chunks(self, phase: str, range_sql: str, chunk_sql: str, cutoff: str) -> int:
+        # The range only sizes progress reports; chunks walk matching ids with
+        # keyset pagination so gaps left by earlier purges cost nothing
+        low, high = self.pool.query(range_sql, (cutoff,))[0]
+        if low is None:
+            return 0
+
+        span = high - low + 1
+        affected = 0
+        after = low - 1
+        while True:
+            job = lambda conn, after=after: conn.execute(
+                chunk_sql, (after, cutoff, self.chunk_size)
+            ).fetchall()
+            ids = [row[0] for row in self.pool.submit_write(job).result()]
+            if not ids:
+                break
+            affected += len(ids)
+            after = max(ids)
+            self.progress(phase, affected, min(after, high) - low + 1, span)
+            if len(ids) < self.chunk_size:
+                break
+            if self.pause:
+                time.sleep(self.pause)
+        return affected
+
+    def mark(self) -> int:
+        cutoff = self._cutoff(self.retention_days)
+        return self._run_chunks(
+            "mark",
+            """
+            SELECT MIN(id), MAX(id) FROM conversation_history
+            WHERE created_at < ?
+            """,
+            """
+            UPDATE conversation_history
+            SET marked_for_deletion_at = CURRENT_TIMESTAMP
+            WHERE id IN (
+                SELECT id FROM conversation_history
+                WHERE id > ?
+                  AND created_at < ?
+                  AND marked_for_deletion_at IS NULL
+                ORDER BY id
+                LIMIT ?
+            )
+            RETURNING id
+            """,
+            cutoff,
+        )
+
+    def purge(self) -> int:
+        cutoff = self._cutoff(self.purge_after_days)
+        return self._run_chunks(
+            "purge",
+            """
+            SELECT MIN(id), MAX(id) FROM conversation_history
+            WHERE marked_for_deletion_at IS NOT NULL
+              AND marked_for_deletion_at < ?
+            """,
+            """
+            DELETE FROM conversation_history
+            WHERE id IN (
+                SELECT id FROM conversation_history
+                WHERE id > ?
+                  AND marked_for_deletion_at IS NOT NULL
+                  AND marked_for_deletion_at < ?
+                ORDER BY id
+                LIMIT ?
+            )
+            RETURNING id
+            """,
+            cutoff,
+        )
+
+    def run(self) -> dict[str, int | float]:
+        started = time.monotonic()
+        marked = self.mark()
+        purged = self.purge()
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Retention pass done: marked={marked} purged={purged} in {elapsed:.1f}s"
+        )
+        return {"marked": marked, "purged": purged, "seconds": elapsed}
+
+
+def _log_progress(phase: str, affected: int, scanned: int, span: int) -> None:
+    logger.debug(f"Retention {phase}: {scanned}/{span} ids scanned, {affected} rows")
+
+
+class RetentionScheduler:
+    """Runs a ConversationRetention pass on a background thread every interval."""
+
+    def __init__(
+        self,
+        retention: ConversationRetention,
+        interval: float = DEFAULT_RUN_INTERVAL,
+        initial_delay: float = 60.0,
+    ) -> None:
+        self.retention = retention
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.last_result: dict[str, int | float] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="conversation-retention", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        delay = self.initial_delay
+        while not self._stop.wait(delay):
+            try:
+                self.last_result = self.retention.run()
+            except Exception as exc:
+                logger.error(f"Retention pass failed: {exc}")
+            delay = self.interval
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 200.0
+DEFAULT_BUSY_RETRIES = 3
+BUSY_BACKOFF_SECONDS = 0.05
+SAMPLE_SIZE = 1000
+MAX_FINGERPRINTS = 500
+
+T = TypeVar("T")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    normalized = _STRING_LITERAL.sub("?", sql)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+def run_with_busy_retry(
+    func: Callable[[], T],
+    retries: int = DEFAULT_BUSY_RETRIES,
+    on_retry: Callable[[], None] | None = None,
+) -> T:
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except sqlite3.OperationalError as exc:
+            if attempt >= retries or not is_busy_error(exc):
+                raise
+            attempt += 1
+            if on_retry:
+                on_retry()
+            time.sleep(BUSY_BACKOFF_SECONDS * attempt)
+
+
+class _Timing:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def snapshot(self) -> dict[str, float | int]:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(int(len(ordered) * p), len(ordered) - 1)] * 1000
+
+        return {
+            "count": self.count,
+            "avg_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": self.max * 1000,
+        }
+
+
+class PoolStats:
+    """In-process counters for SQLiteConnectionPool.
+
+    Tracks acquire wait and hold time per pool side, per-statement duration
+    grouped by SQL fingerprint, SQLITE_BUSY retries and how often callers had
+    to wait for a connection. Statements slower than slow_query_ms are logged.
+    """
+
+    def __init__(self, slow_query_ms: float | None = DEFAULT_SLOW_QUERY_MS) -> None:
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._wait = {"reader": _Timing(), "writer": _Timing()}
+        self._hold = {"reader": _Timing(), "writer": _Timing()}
+        self._queries: OrderedDict[str, _Timing] = OrderedDict()
+        self.waited_acquires = {"reader": 0, "writer": 0}
+        self.busy_retries = 0
+        self.slow_queries = 0
+
+    def record_acquire(self, side: str, seconds: float, waited: bool) -> None:
+        with self._lock:
+            self._wait[side].add(seconds)
+            if waited:
+                self.waited_acquires[side] += 1
+
+    def record_hold(self, side: str, seconds: float) -> None:
+        with self._lock:
+            self._hold[side].add(seconds)
+
+    def record_query(self, sql: str, seconds: float) -> None:
+        key = fingerprint(sql)
+        with self._lock:
+            timing = self._queries.get(key)
+            if timing is None:
+                timing = self._queries[key] = _Timing()
+                if len(self._queries) > MAX_FINGERPRINTS:
+                    self._queries.popitem(last=False)
+            else:
+                self._queries.move_to_end(key)
+            timing.add(seconds)
+        if self.slow_query_ms is not None and seconds * 1000 >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries += 1
+            logger.warning(f"Slow query ({seconds * 1000:.0f} ms): {key}")
+
+    def record_busy_retry(self) -> None:
+        with self._lock:
+            self.busy_retries += 1
+
+    def snapshot(self, top: int = 20) -> dict:
+        with self._lock:
+            queries = sorted(
+                ((key, timing.total, timing.snapshot()) for key, timing in self._queries.items()),
+                key=lambda item: item[1],
+                reverse=True,
+            )[:top]
+            return {
+                "acquire_wait": {side: t.snapshot() for side, t in self._wait.items()},
+                "hold": {side: t.snapshot() for side, t in self._hold.items()},
+                "waited_acquires": dict(self.waited_acquires),
+                "busy_retries": self.busy_retries,
+                "slow_queries": self.slow_queries,
+                "queries": {key: snap for key, _, snap in queries},
+            }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from queue import Queue, Empty
+from typing import Any, Callable
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 64
+# How long the writer waits for more jobs before committing a batch
+DEFAULT_BATCH_WINDOW = 0.002
+
+WriteJob = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+
+class SQLiteWriter:
+    """Single thread that serializes writes and group-commits jobs.
+
+    Jobs are callables taking a connection. Each batch runs on a connection
+    drawn from the writer pool, and each job inside it runs in its own
+    SAVEPOINT so a failing job is rolled back without aborting the others in
+    the same transaction. The batch is committed once and every job's future
+    is resolved after the commit.
+    """
+
+    def __init__(
+        self,
+        acquire: Callable[[], sqlite3.Connection],
+        release: Callable[[sqlite3.Connection], None],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        name: str = "sqlite-writer",
+        begin: Callable[[sqlite3.Connection], None] | None = None,
+    ) -> None:
+        self._acquire = acquire
+        self._release = release
+        self._begin = begin or (lambda conn: conn.execute("BEGIN IMMEDIATE"))
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._jobs: Queue = Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._closed = False
+        self.last_commit_at = 0.0
+        self._thread.start()
+
+    def submit(self, job: WriteJob) -> Future:
+        if self._closed:
+            raise RuntimeError("SQLite writer is closed")
+        future: Future = Future()
+        self._jobs.put((job, future))
+        return future
+
+    def execute(self, sql: str, params: tuple | None = None) -> Future:
+        params = params or ()
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def executemany(self, sql: str, rows) -> Future:
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+    def close(self, timeout: float | None = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._jobs.put(_STOP)
+        self._thread.join(timeout)
+
+    def _next_batch(self) -> tuple[list, bool]:
+        first = self._jobs.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        stop = False
+        while len(batch) < self.max_batch:
+            try:
+                # A lone job commits at once; only linger for more when
+                # writes are already arriving in a burst
+                if len(batch) > 1:
+                    item = self._jobs.get(timeout=self.batch_window)
+                else:
+                    item = self._jobs.get_nowait()
+            except Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if not batch:
+                continue
+            # Write connections are in autocommit mode; transactions are explicit
+            try:
+                conn = self._acquire()
+            except Exception as exc:
+                logger.error(f"Writer could not acquire a connection: {exc}")
+                self._fail(batch, exc)
+                continue
+            try:
+                self._run_batch(conn, batch)
+            except Exception as exc:
+                # Never let a batch kill the thread; later writes would hang
+                logger.error(f"Write batch of {len(batch)} job(s) failed: {exc}")
+                try:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                except sqlite3.Error as rollback_exc:
+                    logger.error(f"Rollback after failed batch failed: {rollback_exc}")
+                self._fail(batch, exc)
+            finally:
+                self._release(conn)
+
+    @staticmethod
+    def _fail(batch: list, exc: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    def _run_batch(self, conn: sqlite3.Connection, batch: list) -> None:
+        results = []
+        try:
+            self._begin(conn)
+        except sqlite3.Error as exc:
+            self._fail(batch, exc)
+            return
+
+        for index, (job, future) in enumerate(batch):
+            if not future.set_running_or_notify_cancel():
+                continue
+            savepoint = f"job_{index}"
+            conn.execute(f"SAVEPOINT {savepoint}")
+            try:
+                result = job(conn)
+            except BaseException as exc:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+                results.append((future, None, exc))
+                continue
+            conn.execute(f"RELEASE {savepoint}")
+            results.append((future, result, None))
+
+        try:
+            conn.execute("COMMIT")
+            self.last_commit_at = time.monotonic()
+        except sqlite3.Error as exc:
+            logger.error(f"Group commit of {len(batch)} job(s) failed: {exc}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._fail(batch, exc)
+            return
+
+        for future, result, exc in results:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
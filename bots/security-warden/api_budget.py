@@ -0,0 +1,257 @@
+import os
+import re
+import time
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAILY_LIMIT = 5000
+DEFAULT_RATE_PER_MINUTE = 60
+DEFAULT_BURST = 20
+REDIS_KEY_PREFIX = "sfapi:"
+
+# Fraction of the daily budget at which each priority stops being admitted.
+# Low-priority work is deferred first so interactive requests keep working.
+PRIORITY_CEILINGS = {
+    "low": 0.80,
+    "normal": 0.95,
+    "high": 1.0,
+}
+
+_LIMIT_INFO = re.compile(r"api-usage=(\d+)/(\d+)")
+
+# Check-and-increment in one round trip so concurrent workers can't all pass
+# the check and overshoot the cap. Returns the new total, or -1 if refused.
+_RESERVE_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local calls = tonumber(ARGV[1])
+if used + calls > tonumber(ARGV[2]) then
+    return -1
+end
+used = redis.call('INCRBY', KEYS[1], calls)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return used
+"""
+
+# Raise the counter to a usage figure reported by Salesforce, never lowering
+# it, in one step so a concurrent reservation isn't overwritten.
+_RAISE_SCRIPT = """
+local used = tonumber(ARGV[1])
+if used > tonumber(redis.call('GET', KEYS[1]) or '0') then
+    redis.call('SET', KEYS[1], used, 'EX', ARGV[2])
+end
+return redis.call('GET', KEYS[1])
+"""
+
+
+class ApiBudgetExceeded(Exception):
+    """Raised when a call would exceed the Salesforce API budget."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        # BaseWorker defers (instead of failing) tasks that raise with retry_after
+        self.retry_after = retry_after
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _seconds_until_reset(now: datetime) -> float:
+    # Daily budget is tracked per UTC day
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class ApiBudget:
+    """
+    Daily Salesforce API budget shared by every worker.
+
+    Usage is counted per UTC day in Redis (`sfapi:used:{date}`) so all
+    containers draw from the same allowance; without Redis it falls back to an
+    in-process counter. On top of the daily counter a token bucket paces calls,
+    and its refill rate shrinks when we are spending faster than the day is
+    elapsing, so throughput slows down gradually instead of hitting a 403.
+    """
+
+    def __init__(
+        self,
+        daily_limit: int = DEFAULT_DAILY_LIMIT,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        burst: int = DEFAULT_BURST,
+        redis_client=None,
+    ):
+        self.daily_limit = daily_limit
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.redis = redis_client
+        self._local_used = {}
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._reserve_script = redis_client.register_script(_RESERVE_SCRIPT) if redis_client is not None else None
+        self._raise_script = redis_client.register_script(_RAISE_SCRIPT) if redis_client is not None else None
+
+    # ------------------------------------------------------------------
+    # Daily counter
+    # ------------------------------------------------------------------
+
+    def _day_key(self, now: datetime) -> str:
+        return f"{REDIS_KEY_PREFIX}used:{now.strftime('%Y-%m-%d')}"
+
+    def used_today(self) -> int:
+        key = self._day_key(_utc_now())
+        if self.redis is not None:
+            try:
+                return int(self.redis.get(key) or 0)
+            except Exception as e:
+                logger.warning(f"API budget read failed, using local count: {e}")
+        return self._local_used.get(key, 0)
+
+    def _reserve(self, calls: int) -> int:
+        """
+        Atomically add `calls` to today's count if it stays within the limit.
+
+        Returns the new total, or -1 if the calls would exceed the limit.
+        """
+        key = self._day_key(_utc_now())
+        if self._reserve_script is not None:
+            try:
+                return int(self._reserve_script(keys=[key], args=[calls, self.daily_limit, 2 * 86400]))
+            except Exception as e:
+                logger.warning(f"API budget reservation failed, using local count: {e}")
+        with self._lock:
+            used = self._local_used.get(key, 0)
+            if used + calls > self.daily_limit:
+                return -1
+            self._local_used[key] = used + calls
+            return self._local_used[key]
+
+    def record_usage(self, used: int, limit: int = None) -> None:
+        """Sync the counter with usage reported by Salesforce itself."""
+        if limit:
+            self.daily_limit = limit
+        key = self._day_key(_utc_now())
+        if self._raise_script is not None:
+            try:
+                # Only ever move the shared counter forward
+                self._raise_script(keys=[key], args=[used, 2 * 86400])
+                return
+            except Exception as e:
+                logger.warning(f"API budget sync failed: {e}")
+        with self._lock:
+            self._local_used[key] = max(self._local_used.get(key, 0), used)
+
+    def record_limit_info(self, header: str) -> None:
+        """
+        Parse a `Sforce-Limit-Info` response header (e.g. "api-usage=25/5000").
+        """
+        match = _LIMIT_INFO.search(header or "")
+        if match:
+            self.record_usage(int(match.group(1)), int(match.group(2)))
+
+    def remaining(self) -> int:
+        return max(self.daily_limit - self.used_today(), 0)
+
+    def usage_fraction(self) -> float:
+        return self.used_today() / self.daily_limit if self.daily_limit else 1.0
+
+    # ------------------------------------------------------------------
+    # Admission and pacing
+    # ------------------------------------------------------------------
+
+    def admission_delay(self, priority: str = "normal") -> float:
+        """
+        Seconds a task of this priority should wait before using the API.
+
+        Returns 0 when it may run now, otherwise the time until the daily
+        budget resets.
+        """
+        ceiling = PRIORITY_CEILINGS.get(priority, PRIORITY_CEILINGS["normal"])
+        if self.usage_fraction() < ceiling:
+            return 0.0
+        return _seconds_until_reset(_utc_now())
+
+    def _effective_rate(self) -> float:
+        """Calls per second, slowed down when ahead of the day's pace."""
+        base = self.rate_per_minute / 60.0
+        now = _utc_now()
+        day_left = _seconds_until_reset(now) / 86400.0
+        budget_left = self.remaining() / self.daily_limit if self.daily_limit else 0.0
+        if day_left <= 0 or budget_left >= day_left:
+            return base
+        # Spending faster than the clock - scale down proportionally, floor at 10%
+        return base * max(budget_left / day_left, 0.1)
+
+    def _raise_exhausted(self):
+        raise ApiBudgetExceeded(
+            f"Salesforce daily API budget exhausted ({self.daily_limit} calls)",
+            _seconds_until_reset(_utc_now()),
+        )
+
+    def acquire(self, calls: int = 1, max_wait: float = 30.0) -> None:
+        """
+        Draw `calls` from the budget, sleeping for bucket tokens if needed.
+
+        Raises ApiBudgetExceeded if the daily limit is spent or tokens don't
+        become available within `max_wait` seconds.
+        """
+        # Cheap early exit; the authoritative check is the atomic _reserve below
+        if self.used_today() + calls > self.daily_limit:
+            self._raise_exhausted()
+
+        deadline = time.monotonic() + max_wait
+        rate = self._effective_rate()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+                self._last_refill = now
+                if self._tokens >= calls:
+                    self._tokens -= calls
+                    break
+                wait = (calls - self._tokens) / rate
+            if time.monotonic() + wait > deadline:
+                raise ApiBudgetExceeded("Salesforce API rate limit - try again shortly", wait)
+            time.sleep(wait)
+
+        used = self._reserve(calls)
+        if used < 0:
+            self._raise_exhausted()
+        # Warn once per threshold: on the reservation that reaches or crosses it
+        for ceiling in (PRIORITY_CEILINGS["low"], PRIORITY_CEILINGS["normal"]):
+            if used - calls < int(self.daily_limit * ceiling) <= used:
+                logger.warning(f"Salesforce API usage at {used}/{self.daily_limit} calls today")
+
+    def status(self) -> dict:
+        used = self.used_today()
+        return {
+            "used": used,
+            "limit": self.daily_limit,
+            "remaining": max(self.daily_limit - used, 0),
+            "calls_per_minute": round(self._effective_rate() * 60, 2),
+            "resets_in_seconds": int(_seconds_until_reset(_utc_now())),
+        }
+
+
+def build_api_budget():
+    """Build the budget from SF_API_* settings, shared via REDIS_URL when reachable."""
+    redis_client = None
+    try:
+        import redis
+        redis_client = redis.from_url(
+            os.getenv("REDIS_URL", "redis://redis:6379/0"), decode_responses=True
+        )
+        redis_client.ping()
+    except Exception as e:
+        logger.warning(f"API budget using in-process counter only: {e}")
+        redis_client = None
+
+    return ApiBudget(
+        daily_limit=int(os.getenv("SF_API_DAILY_LIMIT", DEFAULT_DAILY_LIMIT)),
+        rate_per_minute=float(os.getenv("SF_API_RATE_PER_MINUTE", DEFAULT_RATE_PER_MINUTE)),
+        burst=int(os.getenv("SF_API_BURST", DEFAULT_BURST)),
+        redis_client=redis_client,
+    )
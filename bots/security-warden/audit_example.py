@@ -4,14 +4,13 @@ Demonstrates querying Salesforce and logging to SQLite.
 """
 
 import sys
-import os
-import sqlite3
 from datetime import datetime, timedelta
 
 # Add path so we can import sf_auth
 sys.path.append("/app")
 
 from sf_auth import get_auth
+from database.db_manager import init_pool
 
 def audit_recent_quotes():
     """Audit quotes created in the last 7 days."""
@@ -36,35 +35,35 @@ def audit_recent_quotes():
     
     print(f"Found {len(quotes)} quotes created in the last 7 days")
     
-    # Log to SQLite
-    db_path = os.getenv("DATABASE_PATH", "/data/apex.db")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    # Log to SQLite - all entries in a single commit
+    pool = init_pool()
+    entries = []
     
     for quote in quotes:
         quote_name = quote.get('Name', 'Unknown')
         status = quote.get('SBQQ__Status__c', 'N/A')
         print(f"  - {quote_name} (Status: {status})")
         
-        # Log audit entry
-        try:
-            cursor.execute("""
-                INSERT INTO interactions (user_id, bot_name, command, raw_input, response_summary)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                "system",
-                "security-warden",
-                "audit_quotes",
-                soql,
-                f"Quote: {quote_name}, Status: {status}"
-            ))
-        except Exception as e:
-            print(f"Failed to log to DB: {e}")
+        entries.append((
+            "system",
+            "security-warden",
+            "audit_quotes",
+            soql,
+            f"Quote: {quote_name}, Status: {status}"
+        ))
     
-    conn.commit()
-    conn.close()
+    try:
+        pool.execute_many("""
+            INSERT INTO interactions (user_id, bot_name, command, raw_input, response_summary)
+            VALUES (?, ?, ?, ?, ?)
+        """, entries)
+    except Exception as e:
+        print(f"Failed to log to DB: {e}")
+        entries = []
+    finally:
+        pool.close()
     
-    print(f"Logged {len(quotes)} audit entries to database")
+    print(f"Logged {len(entries)} audit entries to database")
 
 if __name__ == "__main__":
     audit_recent_quotes()
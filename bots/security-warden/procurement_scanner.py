@@ -1,6 +1,5 @@
 import csv
 import logging
-import sqlite3
 import os
 import sys
 from datetime import datetime
@@ -11,6 +10,7 @@ sys.path.append("/app")
 sys.path.append("/app/shared")
 
 from sf_auth import get_auth
+from database.db_manager import get_pool
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,6 @@ class ErateScanner:
     def __init__(self):
         self.auth = get_auth()
         self.target_states = ['SD', 'NE', 'SOUTH DAKOTA', 'NEBRASKA']
-        self.db_path = os.getenv("DATABASE_PATH", "/data/apex.db")
 
     def scan(self, csv_path):
         """
@@ -144,29 +143,11 @@ class ErateScanner:
         log_msg = f"HIT: {filing['name']} ({filing['state']}) - Priority: {'CRITICAL' if is_territory else 'Normal'}"
         logger.info(log_msg)
         
-        # Persist to SQLite
+        # Persist to SQLite (table comes from migration 003_core_tables.sql)
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS procurement_matches (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    form_470_id TEXT,
-                    applicant_name TEXT,
-                    state TEXT,
-                    service_type TEXT,
-                    posted_date TEXT,
-                    sfdc_account_id TEXT,
-                    is_territory BOOLEAN,
-                    scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
             sfdc_id = filing.get('sfdc_match', {}).get('Id')
             
-            cursor.execute("""
+            get_pool().execute("""
                 INSERT INTO procurement_matches (form_470_id, applicant_name, state, service_type, posted_date, sfdc_account_id, is_territory)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
@@ -178,9 +159,6 @@ class ErateScanner:
                 sfdc_id,
                 is_territory
             ))
-            
-            conn.commit()
-            conn.close()
         except Exception as e:
             logger.error(f"DB Log failed: {e}")
 
@@ -0,0 +1,248 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300  # seconds
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# How long results for each sObject stay fresh. Reference data changes rarely;
+# pipeline and quote data changes throughout the day.
+DEFAULT_OBJECT_TTLS = {
+    "User": 900,
+    "Profile": 3600,
+    "UserRole": 3600,
+    "Account": 600,
+    "Opportunity": 120,
+    "SBQQ__Quote__c": 60,
+}
+
+REDIS_KEY_PREFIX = "sfcache:"
+
+_QUOTED = re.compile(r"'(?:[^'\\]|\\.)*'")
+_WHITESPACE = re.compile(r"\s+")
+_FROM = re.compile(r"\bFROM\s+([A-Za-z0-9_]+)", re.IGNORECASE)
+
+
+def normalize_soql(soql: str) -> str:
+    """
+    Canonical form used as the cache key.
+
+    Collapses whitespace and upper-cases keywords/identifiers (SOQL is
+    case-insensitive) while leaving quoted literals untouched.
+    """
+    parts = []
+    last = 0
+    for match in _QUOTED.finditer(soql):
+        parts.append(_WHITESPACE.sub(" ", soql[last:match.start()]).upper())
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(_WHITESPACE.sub(" ", soql[last:]).upper())
+    return "".join(parts).strip()
+
+
+def soql_sobject(soql: str) -> str:
+    """Primary sObject of a query (the first FROM outside string literals)."""
+    match = _FROM.search(_QUOTED.sub("''", soql))
+    return match.group(1) if match else ""
+
+
+class SOQLCache:
+    """
+    Result cache for read-only SOQL queries.
+
+    Entries are keyed by normalized SOQL, expire after a per-sObject TTL and
+    are evicted LRU once the entry or byte budget is exceeded. With a Redis
+    client the cache is shared by all workers; each sObject has a generation
+    counter that `invalidate()` bumps, so a write on one worker invalidates
+    every cached query on that object everywhere.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        object_ttls: dict = None,
+        default_ttl: int = DEFAULT_TTL,
+        redis_client=None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.object_ttls = {k.lower(): v for k, v in (object_ttls or DEFAULT_OBJECT_TTLS).items()}
+        self.default_ttl = default_ttl
+        self.redis = redis_client
+        # key -> (expires_at, sobject, generation, size, encoded JSON); results
+        # are stored serialized so callers always get their own copy
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, sobject: str) -> int:
+        return self.object_ttls.get(sobject.lower(), self.default_ttl)
+
+    def _key(self, normalized: str) -> str:
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def _generation(self, sobject: str) -> int:
+        if self.redis is not None:
+            try:
+                return int(self.redis.get(f"{REDIS_KEY_PREFIX}gen:{sobject.lower()}") or 0)
+            except Exception as e:
+                logger.warning(f"Query cache generation lookup failed: {e}")
+        return self._generations.get(sobject.lower(), 0)
+
+    def generation_for(self, soql: str) -> int:
+        """
+        Current invalidation generation of the query's sObject.
+
+        Read this *before* running the query and pass it to `set()`, so a
+        write that lands while the query is in flight is not masked.
+        """
+        return self._generation(soql_sobject(normalize_soql(soql)))
+
+    def get(self, soql: str):
+        """Return a copy of the cached result for `soql`, or None on a miss."""
+        normalized = normalize_soql(soql)
+        sobject = soql_sobject(normalized)
+        key = self._key(normalized)
+        generation = self._generation(sobject)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                expires_at, _, entry_gen, _, encoded = entry
+                if expires_at > now and entry_gen == generation:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(encoded)
+                self._drop(key)
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(f"{REDIS_KEY_PREFIX}{generation}:{key}")
+            except Exception as e:
+                logger.warning(f"Query cache Redis read failed: {e}")
+                raw = None
+            if raw:
+                self._store_local(key, sobject, generation, len(raw), raw, now)
+                with self._lock:
+                    self.hits += 1
+                return json.loads(raw)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, soql: str, result, generation: int = None) -> None:
+        """
+        Cache `result` for `soql`.
+
+        `generation` is the value of `generation_for()` taken before the query
+        ran; if the sObject was invalidated since, the result may be stale and
+        is not cached.
+        """
+        normalized = normalize_soql(soql)
+        sobject = soql_sobject(normalized)
+        key = self._key(normalized)
+        current = self._generation(sobject)
+        if generation is None:
+            generation = current
+        elif generation != current:
+            logger.debug(f"Skipping cache write for {sobject}: invalidated during query")
+            return
+        encoded = json.dumps(result)
+        if len(encoded) > self.max_bytes:
+            return
+
+        self._store_local(key, sobject, generation, len(encoded), encoded, time.time())
+        if self.redis is not None:
+            try:
+                self.redis.setex(f"{REDIS_KEY_PREFIX}{generation}:{key}", self.ttl_for(sobject), encoded)
+            except Exception as e:
+                logger.warning(f"Query cache Redis write failed: {e}")
+
+    def invalidate(self, sobject: str) -> None:
+        """Drop every cached query whose primary sObject is `sobject`."""
+        name = sobject.lower()
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            for key in [k for k, e in self._entries.items() if e[1].lower() == name]:
+                self._drop(key)
+        if self.redis is not None:
+            try:
+                # Old generation keys simply age out via their TTL
+                self.redis.incr(f"{REDIS_KEY_PREFIX}gen:{name}")
+            except Exception as e:
+                logger.warning(f"Query cache Redis invalidation failed: {e}")
+        logger.info(f"Invalidated cached queries for {sobject}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _store_local(self, key, sobject, generation, size, encoded, now):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (now + self.ttl_for(sobject), sobject, generation, size, encoded)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry[3]
+
+
+def build_query_cache():
+    """
+    Build the cache from environment settings.
+
+    SF_QUERY_CACHE=0 disables caching; SF_QUERY_CACHE_REDIS=1 shares the
+    cache through REDIS_URL.
+    """
+    if os.getenv("SF_QUERY_CACHE", "1") == "0":
+        return None
+
+    redis_client = None
+    if os.getenv("SF_QUERY_CACHE_REDIS", "0") == "1":
+        try:
+            import redis
+            redis_client = redis.from_url(
+                os.getenv("REDIS_URL", "redis://redis:6379/0"), decode_responses=True
+            )
+            redis_client.ping()
+        except Exception as e:
+            logger.warning(f"Query cache falling back to in-process only: {e}")
+            redis_client = None
+
+    return SOQLCache(
+        max_entries=int(os.getenv("SF_QUERY_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        max_bytes=int(os.getenv("SF_QUERY_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        default_ttl=int(os.getenv("SF_QUERY_CACHE_TTL", DEFAULT_TTL)),
+        redis_client=redis_client,
+    )
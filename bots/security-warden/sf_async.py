@@ -0,0 +1,184 @@
+import os
+import asyncio
+import logging
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_VERSION = os.getenv("SF_API_VERSION", "v59.0")
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("SF_ASYNC_CONCURRENCY", "5"))
+
+
+class AsyncSalesforceClient:
+    """
+    asyncio Salesforce REST client for concurrent SOQL reads.
+
+    Reuses the CLI session from SalesforceAuth (no second login) and sends
+    every request over one keep-alive HTTP/1.1 connection pool. A semaphore
+    caps in-flight queries so a large fan-out can't trip Salesforce's
+    concurrent request limit. Reads go through the same SOQL cache and API
+    budget as SalesforceAuth.query.
+
+    Usage:
+        async with AsyncSalesforceClient(get_auth()) as sf:
+            results = await sf.query_many({"opps": soql_a, "accounts": soql_b})
+    """
+
+    def __init__(self, auth, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 api_version: str = DEFAULT_API_VERSION, timeout: float = 60.0):
+        self.auth = auth
+        self.max_concurrency = max_concurrency
+        self.api_version = api_version
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = None
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self._client:
+            return
+        token, instance_url = await asyncio.to_thread(self.auth.get_access_token)
+        self._client = httpx.AsyncClient(
+            base_url=instance_url,
+            headers={"Authorization": f"Bearer {token}", "Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            timeout=self.timeout,
+        )
+
+    async def close(self):
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def _refresh_token(self, stale_header: str):
+        async with self._token_lock:
+            # Another coroutine may have refreshed while we waited
+            if self._client.headers.get("Authorization") != stale_header:
+                return
+            token, _ = await asyncio.to_thread(self.auth.get_access_token)
+            self._client.headers["Authorization"] = f"Bearer {token}"
+            logger.info("Refreshed Salesforce access token")
+
+    async def _get(self, url: str, params: dict = None) -> dict:
+        await asyncio.to_thread(self.auth.budget.acquire)
+        async with self._semaphore:
+            auth_header = self._client.headers.get("Authorization")
+            response = await self._client.get(url, params=params)
+            if response.status_code == 401:
+                await self._refresh_token(auth_header)
+                response = await self._client.get(url, params=params)
+
+        limit_info = response.headers.get("Sforce-Limit-Info")
+        if limit_info:
+            self.auth.budget.record_limit_info(limit_info)
+        response.raise_for_status()
+        return response.json()
+
+    async def query(self, soql: str, use_cache: bool = True) -> dict:
+        """
+        Run one SOQL query, following nextRecordsUrl until all rows are read.
+
+        Returns the same shape as the CLI's --json output so callers can use
+        either client interchangeably.
+        """
+        cache = self.auth.cache if use_cache else None
+        generation = None
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, soql)
+            if cached is not None:
+                return cached
+            # Taken before the round trip so a concurrent invalidation wins
+            generation = await asyncio.to_thread(cache.generation_for, soql)
+
+        page = await self._get(f"/services/data/{self.api_version}/query", params={"q": soql})
+        records = list(page.get("records", []))
+        while not page.get("done", True) and page.get("nextRecordsUrl"):
+            page = await self._get(page["nextRecordsUrl"])
+            records.extend(page.get("records", []))
+
+        data = {
+            "status": 0,
+            "result": {"totalSize": page.get("totalSize", len(records)), "done": True, "records": records},
+        }
+        if cache is not None:
+            await asyncio.to_thread(cache.set, soql, data, generation=generation)
+        return data
+
+    async def query_many(self, queries: dict) -> dict:
+        """
+        Run several independent queries concurrently.
+
+        Args:
+            queries: name -> SOQL
+
+        Returns:
+            name -> query result (same shape as query())
+        """
+        names = list(queries)
+        results = await asyncio.gather(*(self.query(queries[n]) for n in names))
+        return dict(zip(names, results))
+
+    async def deal_summary(self, opportunity_id: str) -> dict:
+        """
+        Opportunity, account, owner and quotes for one deal, fetched in parallel.
+
+        Related records are selected with semi-joins on the opportunity so no
+        query has to wait for another's result.
+        """
+        opp_filter = f"SELECT {{field}} FROM Opportunity WHERE Id = '{opportunity_id}'"
+        results = await self.query_many({
+            "opportunity": f"""
+                SELECT Id, Name, Amount, StageName, CloseDate, Probability, AccountId, OwnerId
+                FROM Opportunity
+                WHERE Id = '{opportunity_id}'
+            """,
+            "account": f"""
+                SELECT Id, Name, Industry, BillingCity, BillingState
+                FROM Account
+                WHERE Id IN ({opp_filter.format(field="AccountId")})
+            """,
+            "owner": f"""
+                SELECT Id, Name, Profile.Name, UserRole.Name, IsActive
+                FROM User
+                WHERE Id IN ({opp_filter.format(field="OwnerId")})
+            """,
+            "quotes": f"""
+                SELECT Id, Name, SBQQ__Status__c, SBQQ__Primary__c, CreatedDate
+                FROM SBQQ__Quote__c
+                WHERE SBQQ__Opportunity2__c = '{opportunity_id}'
+                ORDER BY CreatedDate DESC
+            """,
+        })
+
+        def records(name):
+            return results[name].get("result", {}).get("records", [])
+
+        opportunity = records("opportunity")
+        if not opportunity:
+            raise ValueError(f"Opportunity {opportunity_id} not found")
+        account = records("account")
+        owner = records("owner")
+        return {
+            "opportunity": opportunity[0],
+            "account": account[0] if account else None,
+            "owner": owner[0] if owner else None,
+            "quotes": records("quotes"),
+        }
+
+
+def run_queries(auth, queries: dict, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> dict:
+    """Synchronous helper for worker code: run `queries` concurrently and wait."""
+    async def _run():
+        async with AsyncSalesforceClient(auth, max_concurrency=max_concurrency) as sf:
+            return await sf.query_many(queries)
+    return asyncio.run(_run())
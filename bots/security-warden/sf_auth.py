@@ -1,11 +1,17 @@
 import os
+import time
 import subprocess
 import json
 import logging
 from simple_salesforce import Salesforce
+from query_cache import build_query_cache
+from api_budget import build_api_budget
 
 logger = logging.getLogger(__name__)
 
+# How often to re-sync the API budget with the org's own usage counter
+LIMITS_SYNC_INTERVAL = int(os.getenv("SF_API_SYNC_INTERVAL", "900"))
+
 class SalesforceAuth:
     """
     Manages Salesforce authentication.
@@ -21,6 +27,13 @@ class SalesforceAuth:
         if not all([self.client_id, self.client_secret, self.refresh_token, self.instance_url]):
             raise ValueError("Missing required Salesforce environment variables")
 
+        # Shared cache for read-only SOQL (None when disabled)
+        self.cache = build_query_cache()
+
+        # Daily API allowance shared by all workers
+        self.budget = build_api_budget()
+        self._limits_synced_at = 0.0
+
     def authenticate_cli(self):
         """
         Authenticate SF CLI using refresh token (sfdx-url method).
@@ -49,6 +62,7 @@ class SalesforceAuth:
             )
             
             logger.info("SF CLI authenticated successfully")
+            self.sync_limits()
             return True
             
         except subprocess.CalledProcessError as e:
@@ -73,6 +87,16 @@ class SalesforceAuth:
             logger.error(f"Failed to create SF client: {e}")
             raise
 
+    def get_access_token(self):
+        """
+        Return (access_token, instance_url) for the CLI's authenticated org.
+
+        Used by REST clients that share the CLI session instead of logging in again.
+        """
+        result = self.run_command(["org", "display", "--target-org", "production", "--json"])
+        org = json.loads(result.stdout).get("result", {})
+        return org["accessToken"], org.get("instanceUrl") or self.instance_url
+
     def run_command(self, args: list):
         """Run arbitrary SF CLI command."""
         try:
@@ -88,8 +112,44 @@ class SalesforceAuth:
             logger.error(f"SF CLI command failed: {e.stderr}")
             raise
 
-    def query(self, soql: str):
-        """Execute SOQL query via CLI."""
+    def sync_limits(self):
+        """
+        Refresh the API budget from the org's DailyApiRequests limit.
+
+        Failures are logged and ignored - the local counter keeps working.
+        """
+        self._limits_synced_at = time.time()
+        try:
+            result = self.run_command(["limits", "api", "display", "--target-org", "production", "--json"])
+            for limit in json.loads(result.stdout).get("result", []):
+                if limit.get("name") == "DailyApiRequests":
+                    used = limit["max"] - limit["remaining"]
+                    self.budget.record_usage(used, limit["max"])
+                    logger.info(f"Salesforce API usage: {used}/{limit['max']}")
+                    break
+        except Exception as e:
+            logger.warning(f"Could not sync Salesforce API limits: {e}")
+
+    def _draw_budget(self):
+        if time.time() - self._limits_synced_at > LIMITS_SYNC_INTERVAL:
+            self.sync_limits()
+        self.budget.acquire()
+
+    def query(self, soql: str, use_cache: bool = True):
+        """
+        Execute SOQL query via CLI.
+
+        Results are served from the query cache when a fresh entry exists;
+        pass use_cache=False to force a round trip.
+        """
+        if use_cache and self.cache:
+            cached = self.cache.get(soql)
+            if cached is not None:
+                logger.debug("SOQL cache hit")
+                return cached
+        # Taken before the round trip so a concurrent invalidation wins
+        generation = self.cache.generation_for(soql) if self.cache else None
+        self._draw_budget()
         try:
             cmd = [
                 "data", "query",
@@ -98,13 +158,17 @@ class SalesforceAuth:
                 "--json"
             ]
             result = self.run_command(cmd)
-            return json.loads(result.stdout)
+            data = json.loads(result.stdout)
+            if self.cache:
+                self.cache.set(soql, data, generation=generation)
+            return data
         except Exception as e:
             logger.error(f"Query failed: {e}")
             raise
 
     def create_record(self, sobject: str, values: str):
         """Create record via CLI (reusing logic from create_cpq_quote.py)."""
+        self._draw_budget()
         try:
             cmd = [
                 "data", "create", "record",
@@ -118,6 +182,10 @@ class SalesforceAuth:
         except Exception as e:
             logger.error(f"Create record failed: {e}")
             raise
+        finally:
+            # Any cached read of this object may now be out of date
+            if self.cache:
+                self.cache.invalidate(sobject)
 
 # Singleton instance
 _auth_instance = None
@@ -2,6 +2,7 @@ import logging
 import sys
 import os
 import json
+import asyncio
 
 # Add shared modules to path (now copied to /app/shared)
 sys.path.append("/app/shared")
@@ -9,6 +10,8 @@ sys.path.append("/app/shared")
 from worker import BaseWorker
 from sf_auth import get_auth
 from procurement_scanner import ErateScanner
+from sf_async import AsyncSalesforceClient
+from database.db_manager import get_pool
 
 logger = logging.getLogger(__name__)
 
@@ -28,12 +31,26 @@ class SalesforceWorker(BaseWorker):
         except Exception as e:
             logger.error(f"Failed to authenticate with Salesforce: {e}")
             sys.exit(1)
+
+        # Open the shared SQLite pool once; this applies pending migrations.
+        # This worker is long-running, so it owns conversation retention.
+        try:
+            get_pool().start_retention_scheduler()
+        except Exception as e:
+            logger.error(f"Failed to initialize database: {e}")
+            sys.exit(1)
         
         # Register task handlers
         self.register_handler("query_records", self.handle_query)
         self.register_handler("create_quote", self.handle_create_quote)
         self.register_handler("audit_permissions", self.handle_audit_permissions)
         self.register_handler("scan_erate", self.handle_scan_erate)
+        self.register_handler("deal_summary", self.handle_deal_summary)
+
+    def check_admission(self, task_data: dict) -> float:
+        """Defer lower-priority tasks first as the daily API budget runs down."""
+        priority = task_data.get("priority", "normal")
+        return get_auth().budget.admission_delay(priority)
 
     def handle_scan_erate(self, payload: dict):
         """Execute E-Rate scan."""
@@ -60,6 +77,21 @@ class SalesforceWorker(BaseWorker):
             "records": result.get("result", {}).get("records", [])
         }
 
+    def handle_deal_summary(self, payload: dict):
+        """Fetch an opportunity with its account, owner and quotes concurrently."""
+        opp_id = payload.get("opportunity_id")
+        if not opp_id:
+            raise ValueError("Missing 'opportunity_id' in payload")
+
+        async def _summary():
+            async with AsyncSalesforceClient(get_auth()) as sf:
+                return await sf.deal_summary(opp_id)
+
+        return {
+            "status": "success",
+            "deal": asyncio.run(_summary())
+        }
+
     def handle_create_quote(self, payload: dict):
         """
         Create a Salesforce CPQ quote.
@@ -4,13 +4,14 @@ import json
 import logging
 import uuid
 from datetime import datetime
+from .result_store import ResultStore, DEFAULT_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
 class TaskQueue:
     """Simple Redis-based Task Queue."""
     
-    def __init__(self, redis_url=None):
+    def __init__(self, redis_url=None, offload_threshold_bytes: int = None):
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://redis:6379/0")
         try:
             self.redis = redis.from_url(self.redis_url, decode_responses=True)
@@ -19,6 +20,7 @@ class TaskQueue:
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
+        self.results = ResultStore(self.redis, threshold_bytes=offload_threshold_bytes)
 
     def enqueue(self, queue_name: str, task_type: str, payload: dict, priority: str = "normal") -> str:
         """
@@ -28,7 +30,7 @@ class TaskQueue:
             queue_name: Name of the queue (e.g., 'salesforce_tasks', 'notion_sync')
             task_type: Identifier for the worker (e.g., 'create_quote')
             payload: Dict containing task arguments
-            priority: 'high', 'normal', 'low' (not yet implemented, placeholder)
+            priority: 'high', 'normal', 'low' (low is deferred first when workers shed load)
             
         Returns:
             task_id: Unique UUID
@@ -61,17 +63,41 @@ class TaskQueue:
             return json.loads(data)
         return None
 
-    def update_task_status(self, task_id: str, status: str, result: dict = None):
-        """Update task status (used by workers)."""
+    def update_task_status(self, task_id: str, status: str, result: dict = None, **fields):
+        """
+        Update task status (used by workers).
+
+        Results larger than the offload threshold are stored separately and
+        the status only keeps a `result_ref` (see ResultStore). Extra keyword
+        fields (e.g. retry_at) are stored next to the status; without a new
+        `result` the existing one is kept.
+        """
         data_str = self.redis.get(f"task:{task_id}")
         if data_str:
             data = json.loads(data_str)
             data["status"] = status
             data["updated_at"] = datetime.utcnow().isoformat()
-            if result:
-                data["result"] = result
-            
+            data.update(fields)
+
             # Update with same TTL
             ttl = self.redis.ttl(f"task:{task_id}")
             if ttl < 0: ttl = 86400
+
+            if result:
+                data["result"] = self.results.offload(task_id, result, ttl)
             self.redis.setex(f"task:{task_id}", ttl, json.dumps(data))
+
+    def iter_task_result_rows(self, task_id: str, page_size: int = DEFAULT_PAGE_SIZE):
+        """
+        Stream result rows for a completed task.
+
+        Works for both inline results (yields the `records` list) and
+        offloaded ones (pages through the stored rows).
+        """
+        task = self.get_task_status(task_id)
+        result = (task or {}).get("result") or {}
+        ref = result.get("result_ref")
+        if ref:
+            yield from self.results.iter_rows(ref, page_size)
+        else:
+            yield from result.get(self.results.rows_field, [])
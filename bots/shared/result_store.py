@@ -0,0 +1,101 @@
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024  # bytes of serialized result
+DEFAULT_PAGE_SIZE = 500
+RESULT_KEY_PREFIX = "result:"
+# Rows are pushed to Redis in batches so a 50k-row result isn't one giant command
+PUSH_BATCH_SIZE = 1000
+
+
+class ResultStore:
+    """
+    Offloads large task results out of the `task:{id}` status value.
+
+    Results whose JSON encoding exceeds the threshold are written once to a
+    Redis list `result:{task_id}` (one JSON row per element); the task status
+    keeps only a small `result_ref` with the key and row count. Consumers page
+    through the rows with `iter_rows`/`read_page` instead of loading them all.
+    """
+
+    def __init__(self, redis_client, threshold_bytes: int = None, rows_field: str = "records"):
+        self.redis = redis_client
+        self.threshold_bytes = threshold_bytes or int(
+            os.getenv("RESULT_OFFLOAD_BYTES", DEFAULT_OFFLOAD_THRESHOLD)
+        )
+        self.rows_field = rows_field
+
+    def offload(self, task_id: str, result: dict, ttl: int) -> dict:
+        """
+        Return the value to embed in the task status for `result`.
+
+        Small results are returned unchanged. Large ones are stored under
+        `result:{task_id}` and replaced by a summary holding a `result_ref`.
+        """
+        encoded = json.dumps(result)
+        if len(encoded) <= self.threshold_bytes:
+            return result
+
+        key = f"{RESULT_KEY_PREFIX}{task_id}"
+        rows = result.get(self.rows_field) if isinstance(result, dict) else None
+        if isinstance(rows, list):
+            summary = {k: v for k, v in result.items() if k != self.rows_field}
+            kind = "rows"
+        else:
+            # No row array to page through - store the whole result as one item
+            rows = [result]
+            summary = {}
+            kind = "blob"
+
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        for start in range(0, len(rows), PUSH_BATCH_SIZE):
+            batch = rows[start:start + PUSH_BATCH_SIZE]
+            pipe.rpush(key, *[json.dumps(row) for row in batch])
+        pipe.expire(key, ttl)
+        pipe.execute()
+
+        summary["result_ref"] = {
+            "key": key,
+            "kind": kind,
+            "field": self.rows_field if kind == "rows" else None,
+            "row_count": len(rows),
+            "bytes": len(encoded),
+        }
+        logger.info(f"Offloaded result for task {task_id} ({len(rows)} rows, {len(encoded)} bytes) to {key}")
+        return summary
+
+    def read_page(self, ref: dict, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> list:
+        """Read `limit` rows starting at `offset` from an offloaded result."""
+        if limit <= 0:
+            return []
+        raw = self.redis.lrange(ref["key"], offset, offset + limit - 1)
+        return [json.loads(row) for row in raw]
+
+    def iter_rows(self, ref: dict, page_size: int = DEFAULT_PAGE_SIZE):
+        """Yield rows from an offloaded result, fetching one page at a time."""
+        offset = 0
+        while True:
+            page = self.read_page(ref, offset, page_size)
+            if not page:
+                return
+            yield from page
+            offset += len(page)
+
+    def load(self, summary: dict) -> dict:
+        """Rebuild the full result from a summary (loads every row into memory)."""
+        ref = summary.get("result_ref") if isinstance(summary, dict) else None
+        if not ref:
+            return summary
+        rows = list(self.iter_rows(ref))
+        if ref["kind"] == "blob":
+            return rows[0] if rows else {}
+        result = {k: v for k, v in summary.items() if k != "result_ref"}
+        result[ref["field"]] = rows
+        return result
+
+    def delete(self, task_id: str) -> None:
+        self.redis.delete(f"{RESULT_KEY_PREFIX}{task_id}")
@@ -1,16 +1,39 @@
 import logging
 import json
+import os
 import time
 import signal
 import sys
+import threading
+from collections import deque
 from .queue_client import TaskQueue
+from .worker_registry import WORKER_KEY_PREFIX, WORKER_SET_KEY
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_HEARTBEAT_INTERVAL = 10  # seconds
+THROUGHPUT_WINDOW = 60  # seconds of completed tasks used for tasks/sec
+
+
+def _memory_rss_bytes() -> int:
+    """Current resident set size of this process, in bytes."""
+    try:
+        # Linux containers: second field of statm is resident pages
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        # ru_maxrss is peak RSS (KB on Linux, bytes on macOS) - best effort fallback
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
 class BaseWorker:
     """Base class for Queue Workers."""
     
-    def __init__(self, queue_name: str, worker_id: str = "worker-1"):
+    def __init__(self, queue_name: str, worker_id: str = "worker-1",
+                 heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL):
         self.queue_name = queue_name
         self.worker_id = worker_id
         self.running = False
@@ -19,6 +42,17 @@ class BaseWorker:
         # Handlers registry: "task_type" -> function
         self.handlers = {}
 
+        # Heartbeat state (read by the heartbeat thread, written by the loop)
+        self.heartbeat_interval = heartbeat_interval
+        self.started_at = time.time()
+        self.current_task = None
+        self.current_task_started_at = None
+        self.tasks_completed = 0
+        self.tasks_failed = 0
+        self._completions = deque()
+        self._state_lock = threading.Lock()
+        self._heartbeat_thread = None
+
         # Signal handling
         signal.signal(signal.SIGINT, self._shutdown)
         signal.signal(signal.SIGTERM, self._shutdown)
@@ -31,10 +65,13 @@ class BaseWorker:
     def run(self):
         """Main worker loop."""
         self.running = True
+        self._start_heartbeat()
         logger.info(f"Worker {self.worker_id} started listening on 'queue:{self.queue_name}'")
         
         while self.running:
             try:
+                self._promote_delayed()
+
                 # Blocking pop (timeout 5s to allow shutdown check)
                 # redis.blpop returns tuple (key, value) or None
                 item = self.queue.redis.blpop(f"queue:{self.queue_name}", timeout=5)
@@ -47,11 +84,18 @@ class BaseWorker:
                 logger.error(f"Worker loop error: {e}")
                 time.sleep(1) # Prevent tight loop on error
 
+        self._stop_heartbeat()
+
     def _process_task(self, task_data: dict):
         task_id = task_data.get("id")
         task_type = task_data.get("type")
         payload = task_data.get("payload", {})
         
+        delay = self.check_admission(task_data)
+        if delay > 0:
+            self.defer_task(task_data, delay)
+            return
+
         logger.info(f"Processing task {task_id} ({task_type})")
         
         self.queue.update_task_status(task_id, "processing")
@@ -60,17 +104,152 @@ class BaseWorker:
         if not handler:
             logger.error(f"No handler for task type '{task_type}'")
             self.queue.update_task_status(task_id, "failed", {"error": f"Unknown task type: {task_type}"})
+            self._record_outcome(failed=True)
             return
 
+        self._set_current_task(task_id, task_type)
         try:
             # Execute handler
             result = handler(payload)
             self.queue.update_task_status(task_id, "completed", result)
+            self._record_outcome(failed=False)
             logger.info(f"Task {task_id} completed")
         except Exception as e:
+            # Handlers signal "not now" (e.g. API budget spent) with retry_after
+            retry_after = getattr(e, "retry_after", None)
+            if retry_after:
+                logger.warning(f"Task {task_id} deferred: {e}")
+                self.defer_task(task_data, retry_after)
+                return
             logger.error(f"Task {task_id} failed: {e}")
             self.queue.update_task_status(task_id, "failed", {"error": str(e)})
+            self._record_outcome(failed=True)
+        finally:
+            self._set_current_task(None, None)
+
+    # ------------------------------------------------------------------
+    # Deferral
+    # ------------------------------------------------------------------
+
+    def check_admission(self, task_data: dict) -> float:
+        """
+        Return seconds to defer this task before running it (0 = run now).
+
+        Subclasses override this to shed load, e.g. by priority.
+        """
+        return 0.0
+
+    def defer_task(self, task_data: dict, delay: float):
+        """Park a task in the delayed set; it is re-queued once `delay` passes."""
+        task_id = task_data.get("id")
+        retry_at = time.time() + delay
+        self.queue.redis.zadd(f"delayed:{self.queue_name}", {json.dumps(task_data): retry_at})
+        self.queue.update_task_status(task_id, "deferred", retry_at=retry_at)
+        logger.info(f"Deferred task {task_id} for {delay:.0f}s")
+
+    def _promote_delayed(self, limit: int = 100):
+        """Move delayed tasks whose time has come back onto the queue."""
+        key = f"delayed:{self.queue_name}"
+        due = self.queue.redis.zrangebyscore(key, 0, time.time(), start=0, num=limit)
+        for task_json in due:
+            # zrem succeeds for exactly one worker, so each task is promoted once
+            if self.queue.redis.zrem(key, task_json):
+                self.queue.redis.rpush(f"queue:{self.queue_name}", task_json)
+
+    # ------------------------------------------------------------------
+    # Heartbeat
+    # ------------------------------------------------------------------
+
+    def _set_current_task(self, task_id, task_type):
+        with self._state_lock:
+            self.current_task = {"id": task_id, "type": task_type} if task_id else None
+            self.current_task_started_at = time.time() if task_id else None
+
+    def _record_outcome(self, failed: bool):
+        now = time.time()
+        with self._state_lock:
+            if failed:
+                self.tasks_failed += 1
+            else:
+                self.tasks_completed += 1
+            self._completions.append(now)
+            self._trim_completions(now)
+
+    def _trim_completions(self, now: float):
+        cutoff = now - THROUGHPUT_WINDOW
+        while self._completions and self._completions[0] < cutoff:
+            self._completions.popleft()
+
+    def heartbeat_payload(self) -> dict:
+        """Snapshot of this worker's liveness and load, as published to Redis."""
+        now = time.time()
+        with self._state_lock:
+            self._trim_completions(now)
+            window = min(THROUGHPUT_WINDOW, max(now - self.started_at, 1.0))
+            current = self.current_task
+            task_started = self.current_task_started_at
+            payload = {
+                "worker_id": self.worker_id,
+                "queue": self.queue_name,
+                "pid": os.getpid(),
+                "started_at": self.started_at,
+                "last_heartbeat": now,
+                "heartbeat_interval": self.heartbeat_interval,
+                "current_task_id": current["id"] if current else "",
+                "current_task_type": current["type"] if current else "",
+                "current_task_started_at": task_started or "",
+                "tasks_completed": self.tasks_completed,
+                "tasks_failed": self.tasks_failed,
+                "tasks_per_sec": round(len(self._completions) / window, 3),
+                "memory_rss_bytes": _memory_rss_bytes(),
+            }
+        return payload
+
+    def publish_heartbeat(self):
+        """Write the heartbeat hash (with TTL) and register this worker."""
+        key = f"{WORKER_KEY_PREFIX}{self.worker_id}"
+        # Hash expires if we stop beating, so dead workers disappear on their own
+        ttl = max(int(self.heartbeat_interval * 3), 1)
+        pipe = self.queue.redis.pipeline()
+        pipe.hset(key, mapping=self.heartbeat_payload())
+        pipe.expire(key, ttl)
+        pipe.sadd(WORKER_SET_KEY, self.worker_id)
+        pipe.execute()
+
+    def _heartbeat_loop(self):
+        while self.running:
+            try:
+                self.publish_heartbeat()
+            except Exception as e:
+                logger.warning(f"Heartbeat publish failed: {e}")
+            self._heartbeat_stop.wait(self.heartbeat_interval)
+
+    def _start_heartbeat(self):
+        if not self.heartbeat_interval or self._heartbeat_thread:
+            return
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop,
+            name=f"heartbeat-{self.worker_id}",
+            daemon=True,
+        )
+        self._heartbeat_thread.start()
+
+    def _stop_heartbeat(self):
+        if not self._heartbeat_thread:
+            return
+        self._heartbeat_stop.set()
+        self._heartbeat_thread.join(timeout=self.heartbeat_interval)
+        self._heartbeat_thread = None
+        try:
+            # Clean exit: deregister immediately rather than waiting for the TTL
+            self.queue.redis.delete(f"{WORKER_KEY_PREFIX}{self.worker_id}")
+            self.queue.redis.srem(WORKER_SET_KEY, self.worker_id)
+        except Exception as e:
+            logger.warning(f"Failed to deregister worker {self.worker_id}: {e}")
 
     def _shutdown(self, signum, frame):
         logger.info("Shutdown signal received. Stopping worker...")
         self.running = False
+        if self._heartbeat_thread:
+            self._heartbeat_stop.set()
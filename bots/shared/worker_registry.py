@@ -0,0 +1,124 @@
+import os
+import time
+import logging
+import redis
+
+logger = logging.getLogger(__name__)
+
+WORKER_SET_KEY = "workers"
+WORKER_KEY_PREFIX = "worker:"
+
+# A worker is stale if it missed this many heartbeats in a row
+STALE_HEARTBEAT_MULTIPLIER = 2
+# A task running longer than this (seconds) is flagged as a possibly hung handler
+DEFAULT_HUNG_TASK_SECONDS = 600
+
+_INT_FIELDS = ("pid", "tasks_completed", "tasks_failed", "memory_rss_bytes")
+_FLOAT_FIELDS = ("started_at", "last_heartbeat", "heartbeat_interval",
+                 "current_task_started_at", "tasks_per_sec")
+
+
+class WorkerRegistry:
+    """
+    Read side of the worker heartbeats published by BaseWorker.
+
+    Each worker writes a `worker:{worker_id}` hash with a TTL and adds itself
+    to the `workers` set. Workers whose hash has expired are dead; workers
+    whose hash exists but is old (or whose current task has been running too
+    long) are flagged as stale.
+    """
+
+    def __init__(self, redis_client=None, redis_url=None,
+                 hung_task_seconds: float = DEFAULT_HUNG_TASK_SECONDS):
+        if redis_client is None:
+            redis_url = redis_url or os.getenv("REDIS_URL", "redis://redis:6379/0")
+            redis_client = redis.from_url(redis_url, decode_responses=True)
+        self.redis = redis_client
+        self.hung_task_seconds = hung_task_seconds
+
+    def _decode(self, raw: dict) -> dict:
+        info = dict(raw)
+        for field in _INT_FIELDS:
+            if info.get(field) not in (None, ""):
+                info[field] = int(float(info[field]))
+        for field in _FLOAT_FIELDS:
+            if info.get(field) not in (None, ""):
+                info[field] = float(info[field])
+            else:
+                info[field] = None
+        return info
+
+    def _annotate(self, info: dict, now: float) -> dict:
+        interval = info.get("heartbeat_interval") or 0
+        age = now - (info.get("last_heartbeat") or 0)
+        info["heartbeat_age"] = round(age, 3)
+
+        reasons = []
+        if interval and age > interval * STALE_HEARTBEAT_MULTIPLIER:
+            reasons.append(f"no heartbeat for {age:.0f}s")
+        task_started = info.get("current_task_started_at")
+        if task_started and now - task_started > self.hung_task_seconds:
+            reasons.append(
+                f"task {info.get('current_task_id')} running for {now - task_started:.0f}s"
+            )
+        info["stale"] = bool(reasons)
+        info["stale_reasons"] = reasons
+        return info
+
+    def get_worker(self, worker_id: str) -> dict:
+        """Return heartbeat info for one worker, or None if it isn't alive."""
+        raw = self.redis.hgetall(f"{WORKER_KEY_PREFIX}{worker_id}")
+        if not raw:
+            return None
+        return self._annotate(self._decode(raw), time.time())
+
+    def list_workers(self) -> list:
+        """
+        List all live workers with their latest heartbeat.
+
+        Workers whose heartbeat hash has expired are removed from the registry.
+        """
+        worker_ids = sorted(self.redis.smembers(WORKER_SET_KEY))
+        if not worker_ids:
+            return []
+
+        pipe = self.redis.pipeline()
+        for worker_id in worker_ids:
+            pipe.hgetall(f"{WORKER_KEY_PREFIX}{worker_id}")
+        rows = pipe.execute()
+
+        now = time.time()
+        workers = []
+        dead = []
+        for worker_id, raw in zip(worker_ids, rows):
+            if not raw:
+                dead.append(worker_id)
+                continue
+            workers.append(self._annotate(self._decode(raw), now))
+
+        if dead:
+            logger.info(f"Pruning expired workers from registry: {', '.join(dead)}")
+            self.redis.srem(WORKER_SET_KEY, *dead)
+        return workers
+
+    def stale_workers(self) -> list:
+        """Live workers that missed heartbeats or appear stuck on a task."""
+        return [w for w in self.list_workers() if w["stale"]]
+
+    def summary(self) -> dict:
+        """Aggregate load per queue, for alerting and autoscaling decisions."""
+        queues = {}
+        for w in self.list_workers():
+            q = queues.setdefault(w.get("queue") or "unknown", {
+                "workers": 0,
+                "busy": 0,
+                "stale": 0,
+                "tasks_per_sec": 0.0,
+                "memory_rss_bytes": 0,
+            })
+            q["workers"] += 1
+            q["busy"] += 1 if w.get("current_task_id") else 0
+            q["stale"] += 1 if w["stale"] else 0
+            q["tasks_per_sec"] += w.get("tasks_per_sec") or 0.0
+            q["memory_rss_bytes"] += w.get("memory_rss_bytes") or 0
+        return queues
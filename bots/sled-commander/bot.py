@@ -21,6 +21,11 @@ TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 ALLOWED_USERS = [int(u) for u in os.getenv("TELEGRAM_ALLOWED_USERS", "").split(",") if u]
 DB_PATH = os.getenv("DATABASE_PATH", "/data/apex.db")
 
+# Webhook mode (long polling is used when TELEGRAM_WEBHOOK_URL is unset);
+# host/port/secret are read by WebhookServer.from_env
+WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")
+MAX_CONCURRENT_UPDATES = int(os.getenv("TELEGRAM_CONCURRENT_UPDATES", "32"))
+
 # Import shared db init
 sys.path.append("/app/shared")
 try:
@@ -30,6 +35,14 @@ except ImportError:
     # Fallback or local dev handled differently
     pass
 
+# Telegram gateway modules (execution/bots/shared, copied to /app/gateway)
+if os.path.isdir("/app/gateway"):
+    sys.path.append("/app/gateway")
+else:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "execution", "bots", "shared"))
+from update_processor import ChatOrderedUpdateProcessor
+from webhook_server import WebhookServer
+
 async def auth_middleware(update: Update) -> bool:
     """Check if user is allowed to interact with the bot."""
     if not update.effective_user:
@@ -103,7 +116,12 @@ def main():
     except Exception as e:
         logger.error(f"DB Init failed: {e}")
 
-    application = ApplicationBuilder().token(TOKEN).build()
+    application = (
+        ApplicationBuilder()
+        .token(TOKEN)
+        .concurrent_updates(ChatOrderedUpdateProcessor(MAX_CONCURRENT_UPDATES))
+        .build()
+    )
     
     # Handlers
     application.add_handler(CommandHandler('start', start))
@@ -113,8 +131,15 @@ def main():
     # Catch-all for non-command text
     application.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), unknown))
     
-    logger.info("SLED Commander started polling...")
-    application.run_polling()
+    if WEBHOOK_URL:
+        # Same secret path/token scheme as every other bot on the shared server
+        server = WebhookServer.from_env()
+        server.add_bot("SLED Commander", application)
+        logger.info(f"SLED Commander listening for webhooks on port {server.port}...")
+        asyncio.run(server.serve_forever())
+    else:
+        logger.info("SLED Commander started polling...")
+        application.run_polling()
 
 if __name__ == '__main__':
     # Initialize DB (Task 3)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Broadcast Engine - Concurrent, rate-limited message fan-out for Telegram
+
+Telegram allows roughly 30 messages/second per bot overall and 1 message/second
+per chat. This module sends to many chats concurrently while staying under
+both limits:
+- A global token bucket caps total throughput
+- A per-chat limiter spaces messages to the same chat
+- 429 responses (RetryAfter) pause the whole engine for the requested time
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_RATE_PER_SEC = 30.0
+PER_CHAT_INTERVAL = 1.0
+MAX_CONCURRENCY = 20
+MAX_RETRIES = 3
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    """RetryAfter.retry_after is an int in older PTB releases, a timedelta in newer ones"""
+    value = error.retry_after
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens/second, up to `capacity` in a burst"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Hold all acquisitions for `seconds` (used when Telegram returns 429)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class PerChatLimiter:
+    """Spaces consecutive sends to the same chat by at least `interval` seconds"""
+
+    def __init__(self, interval: float = PER_CHAT_INTERVAL):
+        self.interval = interval
+        self._next_allowed: Dict[int, float] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def wait(self, chat_id: int):
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            next_allowed = self._next_allowed.get(chat_id, 0.0)
+            if next_allowed > now:
+                await asyncio.sleep(next_allowed - now)
+            self._next_allowed[chat_id] = max(now, next_allowed) + self.interval
+        self._prune()
+
+    def defer(self, chat_id: int, seconds: float):
+        self._next_allowed[chat_id] = max(self._next_allowed.get(chat_id, 0.0), time.monotonic() + seconds)
+
+    def _prune(self):
+        # Keep memory flat: forget chats whose slot has long passed
+        if len(self._next_allowed) < 1000:
+            return
+        cutoff = time.monotonic() - 60
+        for chat_id in [c for c, t in self._next_allowed.items() if t < cutoff]:
+            self._next_allowed.pop(chat_id, None)
+            lock = self._locks.get(chat_id)
+            if lock and not lock.locked():
+                self._locks.pop(chat_id, None)
+
+
+@dataclass
+class BroadcastResult:
+    """Outcome of a broadcast"""
+    delivered: int = 0
+    failed: int = 0
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {"delivered": self.delivered, "failed": self.failed, "errors": dict(self.errors)}
+
+
+class BroadcastEngine:
+    """
+    Sends messages concurrently through global and per-chat rate limits
+
+    Example:
+        engine = BroadcastEngine(application.bot.send_message)
+        result = await engine.broadcast([123, 456], "🚨 Alert!")
+        print(result.delivered, result.failed)
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., Awaitable[Any]],
+        global_rate: float = GLOBAL_RATE_PER_SEC,
+        per_chat_interval: float = PER_CHAT_INTERVAL,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self._send = send
+        self.bucket = TokenBucket(global_rate)
+        self.chat_limiter = PerChatLimiter(per_chat_interval)
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def send(self, chat_id: int, text: str, **kwargs) -> Any:
+        """
+        Send one message, waiting for rate limits and retrying 429s/network errors
+
+        Raises the last error if the message could not be delivered.
+        """
+        attempt = 0
+        while True:
+            # Wait out this chat's spacing before taking a concurrency slot,
+            # so one busy chat can't hold every slot while it sleeps
+            await self.chat_limiter.wait(chat_id)
+            backoff = 0
+            async with self._semaphore:
+                await self.bucket.acquire()
+                try:
+                    return await self._send(chat_id=chat_id, text=text, **kwargs)
+                except RetryAfter as e:
+                    delay = _retry_after_seconds(e)
+                    logger.warning(f"Telegram rate limit hit, pausing {delay:.0f}s")
+                    self.bucket.pause(delay)
+                    self.chat_limiter.defer(chat_id, delay)
+                except (Forbidden, BadRequest):
+                    # User blocked the bot / bad chat - retrying won't help
+                    raise
+                except (TimedOut, NetworkError) as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    backoff = 2 ** attempt
+                    logger.warning(f"Retrying send to {chat_id} after network error: {e}")
+            if backoff:
+                await asyncio.sleep(backoff)
+            attempt += 1
+            if attempt > self.max_retries:
+                raise RuntimeError(f"Gave up sending to {chat_id} after {attempt} attempts")
+
+    async def broadcast(self, chat_ids: Iterable[int], text: str, **kwargs) -> BroadcastResult:
+        """Send `text` to every chat concurrently and report delivered/failed counts"""
+        chat_ids = list(chat_ids)
+        outcomes = await asyncio.gather(
+            *(self.send(chat_id, text, **kwargs) for chat_id in chat_ids),
+            return_exceptions=True,
+        )
+
+        result = BroadcastResult()
+        for chat_id, outcome in zip(chat_ids, outcomes):
+            if isinstance(outcome, BaseException):
+                result.failed += 1
+                result.errors[chat_id] = str(outcome)
+            else:
+                result.delivered += 1
+        return result
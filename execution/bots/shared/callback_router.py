@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Callback Router - Pattern-based routing for inline keyboard callbacks
+
+Instead of registering one handler per button ("approve_quote_12345"),
+register a pattern once and receive the parsed parameters:
+
+    router.add("approve_quote_{quote_id:int}", approve_quote)
+    router.resolve("approve_quote_12345")  # -> (approve_quote, {"quote_id": 12345})
+
+Also provides TTLCache, a size- and age-bounded LRU store for per-request
+state (e.g. the quote payload behind an approval button), so memory stays
+flat however many approvals go out.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+PLACEHOLDER = re.compile(r"\{(\w+)(?::(int|str))?\}")
+CONVERTERS = {"int": (r"-?\d+", int), "str": (r".+?", str)}
+
+
+class CallbackRoute:
+    """A compiled callback pattern"""
+
+    def __init__(self, pattern: str, handler: Callable):
+        self.pattern = pattern
+        self.handler = handler
+        self.converters: Dict[str, Callable[[str], Any]] = {}
+
+        regex, position = "", 0
+        for match in PLACEHOLDER.finditer(pattern):
+            name, kind = match.group(1), match.group(2) or "str"
+            expression, converter = CONVERTERS[kind]
+            regex += re.escape(pattern[position:match.start()]) + f"(?P<{name}>{expression})"
+            self.converters[name] = converter
+            position = match.end()
+        regex += re.escape(pattern[position:])
+
+        self.regex: Pattern = re.compile(regex)
+        first = PLACEHOLDER.search(pattern)
+        self.prefix = pattern[:first.start()] if first else pattern
+
+    def match(self, data: str) -> Optional[Dict[str, Any]]:
+        found = self.regex.fullmatch(data)
+        if not found:
+            return None
+        try:
+            return {name: self.converters[name](value) for name, value in found.groupdict().items()}
+        except ValueError:
+            return None
+
+
+class CallbackRouter:
+    """
+    Routes callback data to handlers by exact string or pattern
+
+    Exact routes are a dict lookup; patterns are tried longest literal
+    prefix first, so "approve_quote_{id}" wins over "approve_{what}".
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, Callable] = {}
+        self._patterns: List[CallbackRoute] = []
+
+    def add(self, pattern: str, handler: Callable):
+        if not PLACEHOLDER.search(pattern):
+            self._exact[pattern] = handler
+            return
+        self._patterns = [route for route in self._patterns if route.pattern != pattern]
+        self._patterns.append(CallbackRoute(pattern, handler))
+        self._patterns.sort(key=lambda route: len(route.prefix), reverse=True)
+
+    def remove(self, pattern: str):
+        self._exact.pop(pattern, None)
+        self._patterns = [route for route in self._patterns if route.pattern != pattern]
+
+    def resolve(self, data: str) -> Optional[Tuple[Callable, Dict[str, Any]]]:
+        """
+        Find the handler for callback data
+
+        Returns:
+            (handler, params) or None if nothing matches
+        """
+        handler = self._exact.get(data)
+        if handler:
+            return handler, {}
+        for route in self._patterns:
+            if not data.startswith(route.prefix):
+                continue
+            params = route.match(data)
+            if params is not None:
+                return route.handler, params
+        return None
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._patterns)
+
+
+class TTLCache:
+    """
+    LRU cache whose entries also expire after ttl seconds
+
+    Example:
+        state = TTLCache(maxsize=10_000, ttl=86_400)
+        state.set("quote:12345", {"account": "Hastings College", "amount": 150_000})
+        state.pop("quote:12345")  # -> dict, or None once expired/evicted
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86_400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _purge_expired(self, now: float):
+        # Oldest entries sit at the front; stop at the first live one. Any expired
+        # stragglers behind it are still bounded by maxsize and dropped on read.
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[key]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.monotonic()
+        self._purge_expired(now)
+        self._data.pop(key, None)
+        self._data[key] = (now + (ttl if ttl is not None else self.ttl), value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, self) is not self
+
+    def __len__(self) -> int:
+        self._purge_expired(time.monotonic())
+        return len(self._data)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Embeddings - Coalesced, micro-batched embedding client
+
+Every incoming message is embedded (intent router, semantic cache), often in
+bursts. Instead of one /embeddings call per request:
+- Cache: an LRU of text-hash -> vector answers repeats instantly
+- Single-flight: concurrent requests for the same text share one result
+- Micro-batching: distinct texts arriving within a few milliseconds go out
+  as one /embeddings call (up to max_batch texts)
+
+Example:
+    embedder = get_embedding_client("text-embedding-3-small")
+    vectors = await embedder.embed_many(["What's in my pipeline?", "Urgent tasks"])
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from litellm_client import DEFAULT_EMBEDDING_MODEL, LiteLLMClient, LiteLLMError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW = 0.003
+DEFAULT_MAX_BATCH = 64
+DEFAULT_CACHE_SIZE = 10_000
+
+
+class EmbeddingClient:
+    """
+    Args:
+        model: Embedding model alias on the LiteLLM proxy
+        client: LiteLLMClient to send batches through (default: new one)
+        batch_window: Seconds to wait for more texts before sending a batch
+        max_batch: Texts per /embeddings call; a full batch is sent at once
+        cache_size: Vectors kept in the LRU cache
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        client: Optional[LiteLLMClient] = None,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.model = model
+        self.client = client or LiteLLMClient()
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: "OrderedDict[str, str]" = OrderedDict()   # key -> text, waiting for the next batch
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "batches": 0, "texts_sent": 0}
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode()).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Batching
+    # ------------------------------------------------------------------
+
+    def _schedule_flush(self):
+        if len(self._pending) >= self.max_batch:
+            if self._flush_handle:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        while self._pending:
+            batch = OrderedDict()
+            while self._pending and len(batch) < self.max_batch:
+                key, text = self._pending.popitem(last=False)
+                batch[key] = text
+            asyncio.get_running_loop().create_task(self._send(batch))
+
+    async def _send(self, batch: "OrderedDict[str, str]"):
+        self.stats["batches"] += 1
+        self.stats["texts_sent"] += len(batch)
+        error: Optional[BaseException] = None
+        try:
+            vectors = await self.client.embed(list(batch.values()), model=self.model)
+            if len(vectors) != len(batch):
+                logger.warning(f"{self.model} returned {len(vectors)} vector(s) for {len(batch)} text(s)")
+            for key, vector in zip(batch, vectors):
+                array = np.asarray(vector, dtype=np.float32)
+                self._remember(key, array)
+                future = self._inflight.pop(key)
+                if not future.done():
+                    future.set_result(array)
+        except Exception as e:
+            error = e
+        except BaseException:
+            # Cancelled (e.g. loop shutdown): waiters still need an answer
+            error = LiteLLMError(f"{self.model}: embedding batch cancelled")
+            raise
+        finally:
+            # Nothing from this batch may stay in flight, or later embeds of
+            # the same text would wait on it forever
+            for key in batch:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(error or LiteLLMError(f"{self.model}: no embedding returned for text"))
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embed one text (cached, coalesced and batched)"""
+        self.stats["requests"] += 1
+        key = self._key(text)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._pending[key] = text
+            self._schedule_flush()
+        # shield: one caller being cancelled must not cancel the shared result
+        return await asyncio.shield(future)
+
+    async def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed several texts; drop-in for LiteLLMClient.embed"""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def close(self):
+        await self.client.close()
+
+
+_shared: Dict[str, EmbeddingClient] = {}
+
+
+def get_embedding_client(model: Optional[str] = None) -> EmbeddingClient:
+    """
+    Process-wide client per model, so all callers share one cache and batcher
+
+    Callers that don't name a model (intent router, semantic cache) share the
+    EMBEDDING_MODEL client, so a message is embedded once for both.
+    """
+    model = model or os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+    if model not in _shared:
+        _shared[model] = EmbeddingClient(
+            model=model,
+            batch_window=float(os.getenv("EMBEDDING_BATCH_WINDOW", DEFAULT_BATCH_WINDOW)),
+        )
+    return _shared[model]
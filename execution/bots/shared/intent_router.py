@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Intent Router - Answer common questions without an LLM generation
+
+Sits in front of the gateway's message handler and classifies each message
+in two cheap tiers before falling back to the LLM:
+1. Keyword/regex tier: instant, exact (e.g. "pipeline", "urgent tasks")
+2. Embedding tier: nearest neighbour against example phrasings, using the
+   shared embedding client (one short call, reused by the semantic cache)
+
+A matched intent runs its handler (a structured answer or a queued task),
+optionally caching the answer for a few minutes. Anything else goes to the
+LLM as before.
+
+Example:
+    async def pipeline_summary(text, update, context):
+        return format_pipeline(await sf.get_pipeline())
+
+    gateway.register_intent(Intent(
+        name="pipeline",
+        handler=pipeline_summary,
+        keywords=["pipeline"],
+        examples=["What's in my pipeline?", "How are my deals looking?"],
+        cache_ttl=300,
+    ))
+"""
+
+import asyncio
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern
+
+import numpy as np
+
+from callback_router import TTLCache
+from embeddings import get_embedding_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.75
+
+EmbedFunction = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+@dataclass
+class Intent:
+    """
+    A question the bot can answer directly
+
+    Args:
+        name: Unique intent name
+        handler: Async function(text, update, context, **params) -> str
+                 (params are named groups from the matching regex), or
+                 None to leave the answer to the gateway's message handler
+                 (the LLM), which then receives intent=<name>
+        keywords: Words/phrases that select this intent (case-insensitive)
+        patterns: Regexes that select this intent (case-insensitive)
+        examples: Example phrasings for the embedding tier
+        cache_ttl: Seconds to reuse the handler's answer in the same chat
+                   (0 = never cache)
+    """
+    name: str
+    handler: Optional[Callable[..., Awaitable[Any]]]
+    keywords: List[str] = field(default_factory=list)
+    patterns: List[str] = field(default_factory=list)
+    examples: List[str] = field(default_factory=list)
+    cache_ttl: float = 0
+
+    def __post_init__(self):
+        self.compiled: List[Pattern] = [re.compile(p, re.IGNORECASE) for p in self.patterns]
+        if self.keywords:
+            words = "|".join(re.escape(k) for k in self.keywords)
+            self.compiled.append(re.compile(rf"\b(?:{words})\b", re.IGNORECASE))
+
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    tier: str                      # "keyword" or "embedding"
+    score: float
+    params: Dict[str, str] = field(default_factory=dict)
+
+
+class IntentRouter:
+    """
+    Two-tier intent classifier with answer caching
+
+    Args:
+        embed: Async function(texts) -> vectors (default: LiteLLM proxy)
+        threshold: Minimum cosine similarity for an embedding-tier match
+    """
+
+    def __init__(self, embed: Optional[EmbedFunction] = None, threshold: Optional[float] = None):
+        if embed is None:
+            # Unset: the shared default client, so the vector is reused downstream
+            embed = get_embedding_client(os.getenv("INTENT_EMBEDDING_MODEL")).embed_many
+        self.embed = embed
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("INTENT_EMBEDDING_THRESHOLD", DEFAULT_THRESHOLD)
+        )
+        self.intents: Dict[str, Intent] = {}
+        self.answers = TTLCache(maxsize=1000)
+        self.stats: Dict[str, int] = {"keyword": 0, "embedding": 0, "fallback": 0, "cached": 0}
+
+        # Embedding index: one unit-length row per example phrase
+        self._matrix: Optional[np.ndarray] = None
+        self._row_intents: List[str] = []
+        self._index_lock = asyncio.Lock()
+
+    def add(self, intent: Intent):
+        self.intents[intent.name] = intent
+        self._matrix = None  # rebuild the embedding index on next use
+
+    async def _build_index(self):
+        async with self._index_lock:
+            if self._matrix is not None:
+                return
+            rows = [(intent.name, example) for intent in self.intents.values() for example in intent.examples]
+            if not rows:
+                self._matrix, self._row_intents = np.zeros((0, 0), dtype=np.float32), []
+                return
+            vectors = np.asarray(await self.embed([example for _, example in rows]), dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+            self._matrix, self._row_intents = vectors, [name for name, _ in rows]
+            logger.info(f"Intent index built: {len(rows)} example(s) for {len(self.intents)} intent(s)")
+
+    async def classify(self, text: str) -> Optional[IntentMatch]:
+        """Match text to an intent, or None for open-ended text"""
+        for intent in self.intents.values():
+            for pattern in intent.compiled:
+                found = pattern.search(text)
+                if found:
+                    self.stats["keyword"] += 1
+                    params = {k: v for k, v in found.groupdict().items() if v is not None}
+                    return IntentMatch(intent, "keyword", 1.0, params)
+
+        try:
+            if self._matrix is None:
+                await self._build_index()
+            if len(self._row_intents):
+                query = np.asarray((await self.embed([text]))[0], dtype=np.float32)
+                scores = self._matrix @ (query / (np.linalg.norm(query) + 1e-12))
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.stats["embedding"] += 1
+                    return IntentMatch(self.intents[self._row_intents[best]], "embedding", float(scores[best]))
+        except Exception as e:
+            # Embeddings are an optimization; never block the LLM fallback
+            logger.warning(f"Intent embedding tier unavailable: {e}")
+
+        self.stats["fallback"] += 1
+        return None
+
+    async def answer(self, match: IntentMatch, text: str, update, context) -> Any:
+        """Run the matched intent's handler, reusing a cached answer if fresh"""
+        intent = match.intent
+        # Answers are per chat: one user's pipeline must never be shown to another
+        chat = getattr(update, "effective_chat", None)
+        cache_key = f"{chat.id if chat else None}:{intent.name}:{sorted(match.params.items())}"
+        if intent.cache_ttl:
+            cached = self.answers.get(cache_key)
+            if cached is not None:
+                self.stats["cached"] += 1
+                return cached
+
+        response = await intent.handler(text, update, context, **match.params)
+        if intent.cache_ttl and isinstance(response, str):
+            self.answers.set(cache_key, response, ttl=intent.cache_ttl)
+        logger.info(f"Intent '{intent.name}' answered via {match.tier} tier (score {match.score:.2f})")
+        return response
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+LiteLLM Client - Async client for the LiteLLM proxy (OpenAI-compatible API)
+
+The proxy (see docker-compose/config/litellm_config.yaml) maps OpenAI model
+aliases onto local Ollama models, e.g. gpt-4o-mini -> llama3.2:1b and
+text-embedding-3-small -> nomic-embed-text.
+
+Example:
+    client = LiteLLMClient()
+    async for token in client.stream_chat([{"role": "user", "content": "Hi"}]):
+        print(token, end="")
+"""
+
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://litellm:4000"
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+class LiteLLMError(Exception):
+    """The proxy returned an error"""
+
+
+class LiteLLMClient:
+    """
+    Thin async wrapper over /v1/chat/completions and /v1/embeddings
+
+    One pooled httpx client is shared by every call.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: float = 300.0,
+        max_connections: int = 20,
+    ):
+        self.base_url = (base_url or os.getenv("LITELLM_API_BASE", DEFAULT_BASE_URL)).rstrip("/")
+        self.api_key = api_key or os.getenv("LITELLM_MASTER_KEY", "sk-apex-local-key")
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_CHAT_MODEL,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion
+
+        Yields:
+            Content deltas as they arrive (server-sent events)
+        """
+        payload = {"model": model, "messages": messages, "stream": True, **params}
+        async with self._client.stream("POST", "/v1/chat/completions", json=payload) as response:
+            if response.status_code >= 400:
+                body = await response.aread()
+                raise LiteLLMError(f"{model}: HTTP {response.status_code}: {body[:200]!r}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise LiteLLMError(f"{model}: {chunk['error']}")
+                for choice in chunk.get("choices", []):
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_CHAT_MODEL,
+        **params: Any,
+    ) -> str:
+        """Non-streaming chat completion; returns the full text"""
+        response = await self._client.post(
+            "/v1/chat/completions",
+            json={"model": model, "messages": messages, "stream": False, **params},
+        )
+        if response.status_code >= 400:
+            raise LiteLLMError(f"{model}: HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()["choices"][0]["message"]["content"] or ""
+
+    async def embed(self, texts: List[str], model: str = DEFAULT_EMBEDDING_MODEL) -> List[List[float]]:
+        """Embed a batch of texts; vectors come back in input order"""
+        response = await self._client.post("/v1/embeddings", json={"model": model, "input": texts})
+        if response.status_code >= 400:
+            raise LiteLLMError(f"{model}: HTTP {response.status_code}: {response.text[:200]}")
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    async def close(self):
+        await self._client.aclose()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+LLM Stream - Stream LLM output into Telegram by editing a message in place
+
+Users see the first tokens within a second instead of waiting for the whole
+generation:
+1. Send a placeholder message right away
+2. Edit it as tokens arrive, coalesced to one edit per interval (Telegram
+   rate-limits edits, roughly one per second per chat)
+3. When the text outgrows Telegram's 4096-character limit, finalize the
+   current message at a paragraph/line/word boundary and continue in a new one
+
+Example:
+    responder = StreamingResponder(application.bot)
+    tokens = llm.stream_chat([{"role": "user", "content": text}])
+    await responder.respond(chat_id, tokens)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, List, Optional
+
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter
+
+from broadcast import _retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MAX_LENGTH = 4096
+PLACEHOLDER = "💭 Thinking..."
+CURSOR = " ▌"
+
+
+def split_text(text: str, limit: int = TELEGRAM_MAX_LENGTH) -> int:
+    """Index to cut text at: last paragraph, line or word break before limit"""
+    if len(text) <= limit:
+        return len(text)
+    for separator in ("\n\n", "\n", " "):
+        cut = text.rfind(separator, limit // 2, limit)
+        if cut != -1:
+            return cut + len(separator)
+    return limit
+
+
+class StreamingResponder:
+    """
+    Renders a token stream as progressively edited Telegram messages
+
+    Args:
+        bot: telegram.Bot used for send_message/edit_message_text
+        edit_interval: Minimum seconds between edits of the same message
+        limit: Maximum characters per message
+    """
+
+    def __init__(self, bot, edit_interval: Optional[float] = None, limit: int = TELEGRAM_MAX_LENGTH):
+        self.bot = bot
+        self.edit_interval = edit_interval if edit_interval is not None else float(
+            os.getenv("TELEGRAM_STREAM_EDIT_INTERVAL", "1.0")
+        )
+        self.limit = limit
+
+    async def _edit(self, message: Message, text: str):
+        while True:
+            try:
+                await message.edit_text(text)
+                return
+            except RetryAfter as e:
+                await asyncio.sleep(_retry_after_seconds(e))
+            except BadRequest as e:
+                if "not modified" in str(e).lower():
+                    return
+                raise
+
+    async def respond(
+        self,
+        chat_id: int,
+        tokens: AsyncIterator[str],
+        reply_to_message_id: Optional[int] = None,
+    ) -> str:
+        """
+        Stream tokens into chat_id
+
+        Returns:
+            The full generated text
+        """
+        started = time.monotonic()
+        messages: List[Message] = [await self.bot.send_message(
+            chat_id, PLACEHOLDER, reply_to_message_id=reply_to_message_id
+        )]
+        parts: List[str] = []
+        committed = 0          # chars already finalized in earlier messages
+        shown = PLACEHOLDER
+        done = asyncio.Event()
+        first_token_at: Optional[float] = None
+
+        async def flush(final: bool = False, suffix: str = ""):
+            nonlocal committed, shown
+            text = "".join(parts)
+            # Roll over into new messages while the live part is too long
+            while len(text) - committed + len(CURSOR) > self.limit:
+                cut = committed + split_text(text[committed:], self.limit - len(CURSOR))
+                await self._edit(messages[-1], text[committed:cut])
+                committed = cut
+                messages.append(await self.bot.send_message(chat_id, PLACEHOLDER))
+                shown = PLACEHOLDER
+            live = text[committed:]
+            rendered = (live + suffix) if final else (live + CURSOR if live else PLACEHOLDER)
+            if final and not rendered.strip():
+                rendered = "🤷 (empty response)"
+            if rendered != shown:
+                await self._edit(messages[-1], rendered[:self.limit])
+                shown = rendered
+
+        async def editor():
+            while not done.is_set():
+                try:
+                    await asyncio.wait_for(done.wait(), timeout=self.edit_interval)
+                except asyncio.TimeoutError:
+                    try:
+                        await flush()
+                    except Exception as e:
+                        # Skip this tick; the final flush retries with the full text
+                        logger.warning(f"Stream edit for {chat_id} failed: {e}")
+
+        editor_task = asyncio.create_task(editor())
+        suffix = ""
+        try:
+            async for token in tokens:
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(token)
+        except Exception as e:
+            logger.error(f"LLM stream to {chat_id} failed: {e}")
+            suffix = "\n\n⚠️ Response interrupted, please try again."
+        finally:
+            done.set()
+            await editor_task
+
+        await flush(final=True, suffix=suffix)
+
+        if first_token_at is not None:
+            logger.info(
+                f"Streamed reply to {chat_id}: first token {first_token_at - started:.2f}s, "
+                f"total {time.monotonic() - started:.2f}s, {len(messages)} message(s)"
+            )
+        return "".join(parts)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Model Router - Cost/latency-aware model selection with hedged requests
+
+Static LiteLLM aliases always hit the same model. This router picks per
+request, walking the Ollama -> Gemini -> Claude -> OpenAI hierarchy (cheapest
+first) using live measurements per model:
+- Rolling p50/p95 time-to-first-token and error rate
+- Queue depth (requests waiting + in flight)
+
+The cheapest healthy model whose expected latency fits the request's budget
+goes first. If it hasn't produced a token by the hedge deadline, the request
+is also sent to the next tier; whichever streams first wins and the other is
+cancelled (closing its HTTP stream so the model stops generating).
+
+Example:
+    router = ModelRouter.from_env()
+    async for token in router.stream(messages, latency_budget=3.0):
+        ...
+
+Environment:
+    MODEL_ROUTER_TIERS  "model=cost,..." cheapest first, e.g.
+                        "ollama/llama3.2:1b=0,ollama/llama3.2=0.1,gemini/gemini-1.5-flash=1"
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from litellm_client import LiteLLMClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIERS = "gpt-4o-mini=0,gpt-4=0.1"
+WINDOW = 200
+MAX_SAMPLE_AGE = 300.0      # seconds; old samples stop counting so tiers can recover
+UNHEALTHY_ERROR_RATE = 0.5
+EXPLORE_RATE = 0.05         # share of requests that probe a cheaper tier over budget
+
+
+def _recent(samples, now: float) -> List:
+    return [value for at, value in samples if now - at <= MAX_SAMPLE_AGE]
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+@dataclass
+class ModelTier:
+    """
+    A model the router may use
+
+    Args:
+        model: LiteLLM model name/alias
+        cost: Relative cost per request (0 for local models)
+        max_concurrency: Requests sent to this model at once; extras queue
+        base_url: Endpoint override (e.g. a stub server); default LiteLLM proxy
+    """
+    model: str
+    cost: float = 0.0
+    max_concurrency: int = 4
+    base_url: Optional[str] = None
+
+
+@dataclass
+class ModelStats:
+    """Rolling health measurements for one model, as (timestamp, value) samples"""
+    ttft: Deque[Tuple[float, float]] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    outcomes: Deque[Tuple[float, bool]] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    waiting: int = 0
+    in_flight: int = 0
+    hedges_won: int = 0
+    cancelled: int = 0
+
+    def record_ttft(self, seconds: float):
+        self.ttft.append((time.monotonic(), seconds))
+
+    def record_outcome(self, ok: bool):
+        self.outcomes.append((time.monotonic(), ok))
+
+    @property
+    def p50(self) -> Optional[float]:
+        return _percentile(_recent(self.ttft, time.monotonic()), 0.5)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return _percentile(_recent(self.ttft, time.monotonic()), 0.95)
+
+    @property
+    def error_rate(self) -> float:
+        outcomes = _recent(self.outcomes, time.monotonic())
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting + self.in_flight
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "p50_ms": round(self.p50 * 1000, 1) if self.p50 is not None else None,
+            "p95_ms": round(self.p95 * 1000, 1) if self.p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "queue_depth": self.queue_depth,
+            "samples": len(_recent(self.outcomes, time.monotonic())),
+            "hedges_won": self.hedges_won,
+            "cancelled": self.cancelled,
+        }
+
+
+class _Attempt:
+    """One in-flight streaming request to one tier"""
+
+    def __init__(self, router: "ModelRouter", tier: ModelTier, messages, params):
+        self.tier = tier
+        self.stats = router.stats[tier.model]
+        self.stream = router._stream_tier(tier, messages, params)
+        self.started = time.monotonic()
+        self.next = asyncio.ensure_future(self.stream.__anext__())
+
+    async def cancel(self):
+        self.next.cancel()
+        try:
+            await self.next
+        except (asyncio.CancelledError, StopAsyncIteration, Exception):
+            pass
+        await self.stream.aclose()
+
+
+class ModelRouter:
+    """
+    Picks, hedges and fails over between model tiers
+
+    Args:
+        tiers: Models ordered cheapest first
+        hedge_after: Default seconds without a first token before hedging
+        explore_rate: Share of requests that probe a cheaper over-budget tier
+    """
+
+    def __init__(self, tiers: List[ModelTier], hedge_after: float = 2.0, explore_rate: float = EXPLORE_RATE):
+        self.tiers = sorted(tiers, key=lambda tier: tier.cost)
+        self.hedge_after = hedge_after
+        self.explore_rate = explore_rate
+        self.stats: Dict[str, ModelStats] = {tier.model: ModelStats() for tier in self.tiers}
+        self._semaphores = {tier.model: asyncio.Semaphore(tier.max_concurrency) for tier in self.tiers}
+        self._clients: Dict[Optional[str], LiteLLMClient] = {}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        tiers = []
+        for item in os.getenv("MODEL_ROUTER_TIERS", DEFAULT_TIERS).split(","):
+            model, _, cost = item.strip().rpartition("=")
+            tiers.append(ModelTier(model=model, cost=float(cost)))
+        return cls(tiers, hedge_after=float(os.getenv("MODEL_ROUTER_HEDGE_AFTER", "2.0")))
+
+    def _client(self, tier: ModelTier) -> LiteLLMClient:
+        if tier.base_url not in self._clients:
+            self._clients[tier.base_url] = LiteLLMClient(base_url=tier.base_url)
+        return self._clients[tier.base_url]
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def expected_latency(self, tier: ModelTier) -> float:
+        """p95 time-to-first-token, inflated by how far the queue exceeds capacity"""
+        stats = self.stats[tier.model]
+        p95 = stats.p95 if stats.p95 is not None else 0.0   # unmeasured: optimistic
+        backlog = max(0, stats.queue_depth - tier.max_concurrency + 1) / tier.max_concurrency
+        return p95 * (1 + backlog)
+
+    def candidates(self, latency_budget: Optional[float] = None) -> List[ModelTier]:
+        """Tiers in the order to try them for a request"""
+        healthy = [t for t in self.tiers if self.stats[t.model].error_rate < UNHEALTHY_ERROR_RATE]
+        unhealthy = [t for t in self.tiers if t not in healthy]
+        if latency_budget is None:
+            return healthy + unhealthy
+        fits = [t for t in healthy if self.expected_latency(t) <= latency_budget]
+        slow = sorted((t for t in healthy if t not in fits), key=self.expected_latency)
+        # Occasionally lead with a cheaper tier that looks too slow, so its stats
+        # stay fresh; the hedge deadline bounds what this costs the user
+        cheaper = [t for t in slow if not fits or t.cost < fits[0].cost]
+        if cheaper and random.random() < self.explore_rate:
+            probe = min(cheaper, key=lambda tier: tier.cost)
+            return [probe] + fits + [t for t in slow if t is not probe] + unhealthy
+        return fits + slow + unhealthy
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    async def _stream_tier(self, tier: ModelTier, messages, params) -> AsyncIterator[str]:
+        stats = self.stats[tier.model]
+        stats.waiting += 1
+        try:
+            await self._semaphores[tier.model].acquire()
+        finally:
+            stats.waiting -= 1
+
+        stats.in_flight += 1
+        started = time.monotonic()
+        first = True
+        try:
+            async for token in self._client(tier).stream_chat(messages, model=tier.model, **params):
+                if first:
+                    stats.record_ttft(time.monotonic() - started)
+                    first = False
+                yield token
+            stats.record_outcome(True)
+        except (asyncio.CancelledError, GeneratorExit):
+            # Lost a hedge race. A cancel before the first token still says
+            # "at least this slow", so keep it as a latency sample.
+            stats.cancelled += 1
+            if first:
+                stats.record_ttft(time.monotonic() - started)
+            raise
+        except Exception:
+            stats.record_outcome(False)
+            raise
+        finally:
+            stats.in_flight -= 1
+            self._semaphores[tier.model].release()
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        latency_budget: Optional[float] = None,
+        hedge_after: Optional[float] = None,
+        **params,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion from the best available model
+
+        Args:
+            messages: Chat messages
+            latency_budget: Target seconds to first token (guides tier choice)
+            hedge_after: Seconds to wait for a first token before hedging
+                         to the next tier (default: self.hedge_after, capped
+                         at the latency budget)
+
+        Yields:
+            Tokens from whichever model answered first
+        """
+        order = self.candidates(latency_budget)
+        if hedge_after is not None:
+            deadline = hedge_after
+        elif latency_budget is not None:
+            deadline = min(latency_budget, self.hedge_after)
+        else:
+            deadline = self.hedge_after
+        pending: List[_Attempt] = []
+        winner: Optional[_Attempt] = None
+        first_attempt: Optional[_Attempt] = None
+        first_token: Optional[str] = None
+        errors = []
+
+        try:
+            while winner is None:
+                if not pending:
+                    if not order:
+                        raise RuntimeError(f"All model tiers failed: {'; '.join(errors)}")
+                    pending.append(_Attempt(self, order.pop(0), messages, params))
+                    first_attempt = first_attempt or pending[0]
+
+                done, _ = await asyncio.wait(
+                    [attempt.next for attempt in pending],
+                    timeout=deadline,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Nothing yet: hedge to the next tier, keep the first running
+                    if order:
+                        tier = order.pop(0)
+                        logger.info(f"Hedging to {tier.model} after {deadline:.1f}s without a token")
+                        pending.append(_Attempt(self, tier, messages, params))
+                    continue
+
+                for attempt in [a for a in pending if a.next in done]:
+                    pending.remove(attempt)
+                    try:
+                        token = attempt.next.result()
+                    except StopAsyncIteration:
+                        token = ""
+                    except Exception as e:
+                        errors.append(f"{attempt.tier.model}: {e}")
+                        logger.warning(f"Model {attempt.tier.model} failed: {e}")
+                        continue
+                    if winner is None:
+                        winner, first_token = attempt, token
+                    else:
+                        pending.append(attempt)   # cancelled below with the other losers
+        finally:
+            for loser in pending:
+                await loser.cancel()
+
+        if winner is not first_attempt:
+            winner.stats.hedges_won += 1
+        try:
+            if first_token:
+                yield first_token
+            async for token in winner.stream:
+                yield token
+        finally:
+            # Caller stopped early (break/aclose/error): release the tier now,
+            # not whenever the generator is garbage collected
+            await winner.stream.aclose()
+
+    async def complete(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Routed completion, collected into one string"""
+        return "".join([token async for token in self.stream(messages, **kwargs)])
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {model: stats.summary() for model, stats in self.stats.items()}
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Outbox - Durable outbound message queue for the Telegram gateway
+
+Messages are written to the shared SQLite database before any network I/O, so:
+- Senders never wait on Telegram (enqueue is a local insert)
+- Messages survive Telegram outages and bot restarts
+- Superseded messages collapse: a new message with the same collapse_key
+  for the same chat replaces the pending one (e.g. repeated status updates)
+
+A background sender delivers due messages in batches, oldest first, one per
+chat at a time so per-chat order is preserved, and retries with backoff.
+Rows belong to one bot (a hash of its token), so bots sharing the database
+never send each other's messages. Messages are claimed as 'sending' in one
+UPDATE, so two senders never claim the same row and a collapse never
+rewrites one mid-flight; messages that gave up ('failed') are purged after
+a week. The table is created by the database migrations
+(bots/database/migrations/005_telegram_outbox.sql).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from telegram import InlineKeyboardMarkup
+from telegram.error import BadRequest, Forbidden
+
+try:
+    from database.db_manager import DEFAULT_DB_PATH, apply_migrations
+except ImportError:
+    # Running from the repo rather than a container with /app/database
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "bots"))
+    from database.db_manager import DEFAULT_DB_PATH, apply_migrations
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+POLL_INTERVAL = 1.0
+MAX_ATTEMPTS = 20
+MAX_BACKOFF = 600.0
+FAILED_RETENTION = 7 * 86400
+PURGE_INTERVAL = 3600.0
+# A 'sending' claim older than this is assumed abandoned (sender crashed)
+SENDING_LEASE = 300.0
+
+
+def _backoff(attempts: int) -> float:
+    return min(5.0 * (2 ** (attempts - 1)), MAX_BACKOFF)
+
+
+def bot_key(bot_token: str) -> str:
+    """Stable outbox owner id for a bot, without storing its token"""
+    return hashlib.sha256(bot_token.encode()).hexdigest()[:16]
+
+
+class Outbox:
+    """
+    SQLite-backed outbound queue
+
+    Args:
+        bot: Owner id for this bot's rows (see bot_key)
+        db_path: SQLite file (TELEGRAM_OUTBOX_PATH, else DATABASE_PATH)
+        max_attempts: Sends before a message is marked failed
+
+    Example:
+        outbox = Outbox(bot_key(token))
+        await outbox.put(12345, "🟢 Pipeline sync running", collapse_key="sync_status")
+        outbox.start(gateway.broadcaster)   # inside the running event loop
+    """
+
+    def __init__(self, bot: str, db_path: Optional[str] = None, max_attempts: int = MAX_ATTEMPTS):
+        self.bot = bot
+        self.db_path = Path(
+            db_path or os.getenv("TELEGRAM_OUTBOX_PATH") or os.getenv("DATABASE_PATH", DEFAULT_DB_PATH)
+        )
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=30.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        apply_migrations(self._conn)
+        self._lock = threading.Lock()
+        self._requeue_abandoned()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Enqueue
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        chat_id: int,
+        text: str,
+        parse_mode: Optional[str] = "Markdown",
+        reply_markup: Optional[InlineKeyboardMarkup] = None,
+        collapse_key: Optional[str] = None,
+    ) -> int:
+        """Persist a message for delivery; returns its outbox id"""
+        markup = json.dumps(reply_markup.to_dict()) if reply_markup else None
+        now = time.time()
+        with self._lock:
+            if collapse_key:
+                # Replace the pending message this one supersedes
+                cursor = self._conn.execute(
+                    """
+                    UPDATE outbox
+                    SET text = ?, parse_mode = ?, reply_markup = ?, created_at = ?
+                    WHERE bot = ? AND chat_id = ? AND collapse_key = ? AND status = 'pending'
+                    RETURNING id
+                    """,
+                    (text, parse_mode, markup, now, self.bot, chat_id, collapse_key),
+                )
+                row = cursor.fetchone()
+                if row:
+                    return row[0]
+            cursor = self._conn.execute(
+                """
+                INSERT INTO outbox (bot, chat_id, text, parse_mode, reply_markup, collapse_key, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (self.bot, chat_id, text, parse_mode, markup, collapse_key, now, now),
+            )
+            message_id = cursor.lastrowid
+        if self._wakeup:
+            self._wakeup.set()
+        return message_id
+
+    async def put(self, chat_id: int, text: str, **kwargs) -> int:
+        """Async enqueue (the SQLite insert runs off the event loop)"""
+        message_id = await asyncio.to_thread(self.enqueue, chat_id, text, **kwargs)
+        if self._wakeup:
+            self._wakeup.set()
+        return message_id
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _drop_superseded_locked(self, where: str, params=()):
+        # A message returning to 'pending' is superseded if a newer message
+        # with its collapse_key was queued while it was being sent
+        self._conn.execute(
+            f"""
+            DELETE FROM outbox
+            WHERE {where} AND collapse_key IS NOT NULL AND EXISTS (
+                SELECT 1 FROM outbox newer
+                WHERE newer.bot = outbox.bot
+                  AND newer.chat_id = outbox.chat_id
+                  AND newer.collapse_key = outbox.collapse_key
+                  AND newer.status = 'pending'
+            )
+            """,
+            params,
+        )
+
+    def _requeue_abandoned(self):
+        """Claims left 'sending' past the lease (sender crashed) go back in the queue"""
+        where = "bot = ? AND status = 'sending' AND claimed_at < ?"
+        params = (self.bot, time.time() - SENDING_LEASE)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._drop_superseded_locked(where, params)
+                self._conn.execute(f"UPDATE outbox SET status = 'pending' WHERE {where}", params)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _due_batch(self, limit: int = BATCH_SIZE) -> List[sqlite3.Row]:
+        """Claim the oldest pending message per chat, if it is due"""
+        now = time.time()
+        with self._lock:
+            # One statement selects and claims, so concurrent senders (other
+            # processes included) can never claim the same row twice
+            rows = self._conn.execute(
+                """
+                UPDATE outbox SET status = 'sending', claimed_at = ?
+                WHERE status = 'pending' AND id IN (
+                    SELECT o.id FROM outbox o
+                    WHERE o.bot = ?
+                      AND o.status = 'pending'
+                      AND o.next_attempt_at <= ?
+                      AND o.id = (
+                          SELECT MIN(id) FROM outbox
+                          WHERE bot = o.bot AND chat_id = o.chat_id
+                            AND status IN ('pending', 'sending')
+                      )
+                    ORDER BY o.id
+                    LIMIT ?
+                )
+                RETURNING *
+                """,
+                (now, self.bot, now, limit),
+            ).fetchall()
+        return sorted(rows, key=lambda row: row["id"])
+
+    def _mark_sent(self, message_id: int):
+        with self._lock:
+            self._conn.execute("DELETE FROM outbox WHERE id = ? AND status = 'sending'", (message_id,))
+
+    def _mark_failed(self, row: sqlite3.Row, error: str, permanent: bool):
+        attempts = row["attempts"] + 1
+        give_up = permanent or attempts >= self.max_attempts
+        with self._lock:
+            if not give_up:
+                self._drop_superseded_locked("id = ?", (row["id"],))
+            self._conn.execute(
+                """
+                UPDATE outbox
+                SET attempts = ?, last_error = ?, status = ?, next_attempt_at = ?
+                WHERE id = ? AND status = 'sending'
+                """,
+                (
+                    attempts,
+                    error,
+                    "failed" if give_up else "pending",
+                    time.time() + _backoff(attempts),
+                    row["id"],
+                ),
+            )
+        if give_up:
+            logger.error(f"Giving up on outbox message {row['id']} to {row['chat_id']} after {attempts} attempt(s): {error}")
+
+    async def _deliver(self, broadcaster, bot, row: sqlite3.Row):
+        kwargs: Dict[str, Any] = {"parse_mode": row["parse_mode"]}
+        if row["reply_markup"]:
+            kwargs["reply_markup"] = InlineKeyboardMarkup.de_json(json.loads(row["reply_markup"]), bot)
+        try:
+            await broadcaster.send(row["chat_id"], row["text"], **kwargs)
+        except (Forbidden, BadRequest) as e:
+            await asyncio.to_thread(self._mark_failed, row, str(e), True)
+        except Exception as e:
+            await asyncio.to_thread(self._mark_failed, row, str(e), False)
+        else:
+            await asyncio.to_thread(self._mark_sent, row["id"])
+
+    def purge_failed(self, older_than: float = FAILED_RETENTION) -> int:
+        """Delete failed messages queued more than `older_than` seconds ago"""
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM outbox WHERE bot = ? AND status = 'failed' AND created_at < ?",
+                (self.bot, time.time() - older_than,),
+            ).rowcount
+
+    async def run(self, broadcaster, bot=None):
+        """Sender loop: deliver due messages until cancelled"""
+        self._wakeup = asyncio.Event()
+        logger.info(f"Outbox sender started ({self.pending_count()} message(s) pending)")
+        next_purge = 0.0
+        while True:
+            if time.monotonic() >= next_purge:
+                purged = await asyncio.to_thread(self.purge_failed)
+                if purged:
+                    logger.info(f"Purged {purged} failed outbox message(s)")
+                await asyncio.to_thread(self._requeue_abandoned)
+                next_purge = time.monotonic() + PURGE_INTERVAL
+            batch = await asyncio.to_thread(self._due_batch)
+            if batch:
+                await asyncio.gather(*(self._deliver(broadcaster, bot, row) for row in batch))
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, broadcaster, bot=None) -> asyncio.Task:
+        """Start the sender as a background task on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(broadcaster, bot))
+        return self._task
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE bot = ? AND status IN ('pending', 'sending')",
+                (self.bot,),
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
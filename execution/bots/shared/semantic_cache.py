@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Semantic Cache - Reuse LLM answers for near-identical prompts
+
+"What's my pipeline look like?" and "what does my pipeline look like" should
+not each cost seconds of inference. Prompts are embedded (shared embedding
+client, same model as the intent router), kept as unit vectors in one NumPy
+matrix, and a lookup is a single matrix-vector product (cosine similarity)
+over all entries.
+
+- Hits above the similarity threshold return the cached completion
+- Entries are scoped (model + bot/system prompt) so answers never cross bots
+- Per-intent TTLs: volatile answers (pipeline numbers) expire fast, general
+  knowledge lives longer
+- LRU eviction by entry count and total response bytes
+- Persisted to SQLite, reloaded on startup
+
+Example:
+    cache = SemanticCache()
+    hit = await cache.lookup(prompt, scope="gpt-4o-mini")
+    if hit.response is None:
+        response = await llm.complete(...)
+        await cache.store(prompt, response, scope="gpt-4o-mini", vector=hit.vector)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from embeddings import get_embedding_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "/data/semantic_cache.db"
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS semantic_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scope TEXT NOT NULL,
+    intent TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+EmbedFunction = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "pipeline=300,general=86400" into {"pipeline": 300.0, ...}"""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, seconds = item.partition("=")
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+@dataclass
+class CacheLookup:
+    response: Optional[str]
+    score: float
+    vector: Optional[np.ndarray]   # reuse for store() to avoid a second embedding call
+
+
+class SemanticCache:
+    """
+    Embedding-keyed LLM response cache
+
+    Args:
+        db_path: SQLite file for persistence (SEMANTIC_CACHE_PATH)
+        embed: Async function(texts) -> vectors (default: LiteLLM proxy)
+        threshold: Minimum cosine similarity for a hit (SEMANTIC_CACHE_THRESHOLD)
+        max_entries: LRU bound on entry count
+        max_bytes: LRU bound on total cached response size
+        default_ttl: Seconds an entry lives unless its intent says otherwise
+        intent_ttls: Per-intent TTL overrides (SEMANTIC_CACHE_TTLS="pipeline=300,...")
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        embed: Optional[EmbedFunction] = None,
+        threshold: Optional[float] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: Optional[float] = None,
+        intent_ttls: Optional[Dict[str, float]] = None,
+    ):
+        if embed is None:
+            embed = get_embedding_client(os.getenv("SEMANTIC_CACHE_EMBEDDING_MODEL")).embed_many
+        self.embed = embed
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD)
+        )
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl if default_ttl is not None else float(
+            os.getenv("SEMANTIC_CACHE_TTL", DEFAULT_TTL)
+        )
+        self.intent_ttls = intent_ttls if intent_ttls is not None else parse_ttls(
+            os.getenv("SEMANTIC_CACHE_TTLS", "")
+        )
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+        self.db_path = Path(db_path or os.getenv("SEMANTIC_CACHE_PATH", DEFAULT_CACHE_PATH))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+
+        # In-memory index; row i of the matrix belongs to entry self._ids[i].
+        # The buffer grows by doubling so inserts don't copy the whole matrix.
+        self._buffer = np.zeros((0, 0), dtype=np.float32)
+        self._ids: List[int] = []
+        self._scope_codes: Dict[str, int] = {}
+        self._scopes = np.zeros(0, dtype=np.int32)
+        self._responses: List[str] = []
+        self._expires = np.zeros(0)
+        self._last_used = np.zeros(0)
+        self._bytes = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _sql(self, query: str, params=()):
+        with self._db_lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def _load(self):
+        now = time.time()
+        self._sql("DELETE FROM semantic_cache WHERE expires_at <= ?", (now,))
+        rows = self._sql(
+            "SELECT id, scope, response, embedding, expires_at, last_used_at "
+            "FROM semantic_cache ORDER BY last_used_at DESC LIMIT ?",
+            (self.max_entries,),
+        )
+        if not rows:
+            return
+        self._buffer = np.stack([np.frombuffer(row[3], dtype=np.float32) for row in rows])
+        self._ids = [row[0] for row in rows]
+        self._scopes = np.array([self._scope_code(row[1]) for row in rows], dtype=np.int32)
+        self._responses = [row[2] for row in rows]
+        self._expires = np.array([row[4] for row in rows])
+        self._last_used = np.array([row[5] for row in rows])
+        self._bytes = sum(len(r.encode()) for r in self._responses)
+        logger.info(f"Semantic cache loaded {len(rows)} entries from {self.db_path}")
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    @property
+    def _matrix(self) -> np.ndarray:
+        return self._buffer[:len(self._ids)]
+
+    def _scope_code(self, scope: str) -> int:
+        return self._scope_codes.setdefault(scope, len(self._scope_codes))
+
+    def _remove_rows(self, rows: List[int]):
+        if not rows:
+            return
+        doomed = set(rows)
+        removed_ids = [self._ids[i] for i in rows]
+        keep = [i for i in range(len(self._ids)) if i not in doomed]
+        self._bytes -= sum(len(self._responses[i].encode()) for i in rows)
+        self._buffer[:len(keep)] = self._buffer[keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._scopes = self._scopes[keep]
+        self._responses = [self._responses[i] for i in keep]
+        self._expires = self._expires[keep]
+        self._last_used = self._last_used[keep]
+        placeholders = ",".join("?" * len(removed_ids))
+        self._sql(f"DELETE FROM semantic_cache WHERE id IN ({placeholders})", removed_ids)
+
+    def _evict(self, incoming_bytes: int):
+        now = time.time()
+        expired = np.flatnonzero(self._expires <= now).tolist()
+        self._remove_rows(expired)
+        self.stats["evictions"] += len(expired)
+
+        over_count = len(self._ids) + 1 - self.max_entries
+        over_bytes = self._bytes + incoming_bytes - self.max_bytes
+        if over_count <= 0 and over_bytes <= 0:
+            return
+        victims = []
+        for row in np.argsort(self._last_used).tolist():
+            if over_count <= 0 and over_bytes <= 0:
+                break
+            victims.append(row)
+            over_count -= 1
+            over_bytes -= len(self._responses[row].encode())
+        self._remove_rows(victims)
+        self.stats["evictions"] += len(victims)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def _vector(self, prompt: str) -> np.ndarray:
+        vector = np.asarray((await self.embed([prompt]))[0], dtype=np.float32)
+        return vector / (np.linalg.norm(vector) + 1e-12)
+
+    async def lookup(self, prompt: str, scope: str) -> CacheLookup:
+        """
+        Find a cached response for a semantically equivalent prompt
+
+        Returns:
+            CacheLookup; response is None on a miss
+        """
+        vector = await self._vector(prompt)
+        if not self._ids or self._matrix.shape[1] != vector.shape[0]:
+            self.stats["misses"] += 1
+            return CacheLookup(None, 0.0, vector)
+
+        now = time.time()
+        scores = self._matrix @ vector
+        valid = (self._expires > now) & (self._scopes == self._scope_codes.get(scope, -1))
+        scores = np.where(valid, scores, -1.0)
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+        if score < self.threshold:
+            self.stats["misses"] += 1
+            return CacheLookup(None, score, vector)
+
+        self.stats["hits"] += 1
+        self._last_used[best] = now
+        # Read the row before awaiting: a concurrent store/evict may reorder rows
+        entry_id, response = self._ids[best], self._responses[best]
+        await asyncio.to_thread(
+            self._sql,
+            "UPDATE semantic_cache SET hits = hits + 1, last_used_at = ? WHERE id = ?",
+            (now, entry_id),
+        )
+        return CacheLookup(response, score, vector)
+
+    async def store(
+        self,
+        prompt: str,
+        response: str,
+        scope: str,
+        intent: str = "general",
+        vector: Optional[np.ndarray] = None,
+    ):
+        """Cache a completion (pass the lookup's vector to skip re-embedding)"""
+        if not response.strip():
+            return
+        if vector is None:
+            vector = await self._vector(prompt)
+        vector = np.asarray(vector, dtype=np.float32)
+        if self._buffer.shape[1] != vector.shape[0]:
+            # First entry, or the embedding model changed dimensions; start over
+            self._remove_rows(list(range(len(self._ids))))
+            self._buffer = np.zeros((64, vector.shape[0]), dtype=np.float32)
+
+        size = len(response.encode())
+        self._evict(size)
+
+        now = time.time()
+        expires_at = now + self.intent_ttls.get(intent, self.default_ttl)
+        rows = await asyncio.to_thread(
+            self._sql,
+            """
+            INSERT INTO semantic_cache (scope, intent, prompt, response, embedding, created_at, expires_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING id
+            """,
+            (scope, intent, prompt, response, vector.tobytes(), now, expires_at, now),
+        )
+        n = len(self._ids)
+        if n == len(self._buffer):
+            self._buffer = np.concatenate([self._buffer, np.zeros_like(self._buffer)])
+        self._buffer[n] = vector
+        self._ids.append(rows[0][0])
+        self._scopes = np.append(self._scopes, self._scope_code(scope))
+        self._responses.append(response)
+        self._expires = np.append(self._expires, expires_at)
+        self._last_used = np.append(self._last_used, now)
+        self._bytes += size
+
+    def scope_for(self, model: str, system_prompt: Optional[str] = None) -> str:
+        """Scope key: same model and same system prompt only"""
+        if not system_prompt:
+            return model
+        return f"{model}:{hashlib.sha256(system_prompt.encode()).hexdigest()[:16]}"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
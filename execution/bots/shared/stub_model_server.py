@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Stub Model Server - Fake OpenAI-compatible endpoint for exercising the LLM layer
+
+Serves /v1/chat/completions (streaming and not) and /v1/embeddings with
+configurable time-to-first-token, per-token delay and error rate, so the model
+router, streaming responder and embedding client can be driven locally
+without Ollama or cloud keys.
+
+Usage:
+    python3 stub_model_server.py --demo
+        Runs a ModelRouter against a slow "local" stub and a fast "cloud"
+        stub and prints which tier served each request.
+
+    python3 stub_model_server.py --port 4001 --ttft 0.5 --token-delay 0.02
+        Serves one stub until interrupted.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class StubModelServer:
+    """
+    Args:
+        port: Listen port (127.0.0.1)
+        ttft: Seconds before the first token
+        token_delay: Seconds between tokens
+        tokens: Tokens per completion
+        error_rate: Fraction of requests answered with HTTP 500
+        dimensions: Embedding vector size
+    """
+
+    def __init__(
+        self,
+        port: int,
+        ttft: float = 0.1,
+        token_delay: float = 0.01,
+        tokens: int = 20,
+        error_rate: float = 0.0,
+        dimensions: int = 768,
+    ):
+        self.port = port
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.dimensions = dimensions
+        self.requests = 0
+        self.embedding_calls = 0
+        self.embedded_texts = 0
+        self.disconnects = 0
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _chat(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        body = await request.json()
+        if random.random() < self.error_rate:
+            return web.json_response({"error": {"message": "stub failure"}}, status=500)
+
+        await asyncio.sleep(self.ttft)
+        words = [f"{body['model']}-token{i} " for i in range(self.tokens)]
+        if not body.get("stream"):
+            await asyncio.sleep(self.token_delay * self.tokens)
+            return web.json_response({"choices": [{"message": {"role": "assistant", "content": "".join(words)}}]})
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        try:
+            await response.prepare(request)
+            for word in words:
+                chunk = {"choices": [{"delta": {"content": word}}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                await asyncio.sleep(self.token_delay)
+            await response.write(b"data: [DONE]\n\n")
+        except (ConnectionResetError, asyncio.CancelledError):
+            # Client went away (e.g. the router cancelled a losing hedge)
+            self.disconnects += 1
+        return response
+
+    async def _embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        self.embedding_calls += 1
+        self.embedded_texts += len(texts)
+        await asyncio.sleep(self.ttft)
+        data = []
+        for index, text in enumerate(texts):
+            # Deterministic pseudo-embedding per text
+            rng = random.Random(hashlib.sha256(text.encode()).digest())
+            data.append({"index": index, "embedding": [rng.gauss(0, 1) for _ in range(self.dimensions)]})
+        return web.json_response({"data": data, "model": body["model"]})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._chat)
+        app.router.add_post("/v1/embeddings", self._embeddings)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+async def demo():
+    """Cheap local tier that is sometimes slow vs. a fast paid tier"""
+    from model_router import ModelRouter, ModelTier
+
+    local = StubModelServer(4101, ttft=0.1, token_delay=0.005)
+    cloud = StubModelServer(4102, ttft=0.2, token_delay=0.002)
+    await local.start()
+    await cloud.start()
+
+    router = ModelRouter([
+        ModelTier("ollama/llama3.2:1b", cost=0, base_url=local.base_url, max_concurrency=2),
+        ModelTier("gemini/gemini-1.5-flash", cost=1, base_url=cloud.base_url, max_concurrency=8),
+    ], hedge_after=0.5)
+
+    async def one(i):
+        if i % 4 == 0:
+            local.ttft = 2.0   # simulate a cold/overloaded local model
+        started = time.perf_counter()
+        text = await router.complete([{"role": "user", "content": f"question {i}"}], latency_budget=1.5)
+        local.ttft = 0.1
+        return text.split("-token")[0], time.perf_counter() - started
+
+    results = [await one(i) for i in range(12)]
+    results += await asyncio.gather(*(one(100 + i) for i in range(12)))
+    for model, seconds in results:
+        print(f"  • {model:<26} {seconds * 1000:7.0f}ms")
+    print("\n📊 Router stats")
+    for model, stats in router.summary().items():
+        print(f"  • {model}: {stats}")
+    print(f"  • local disconnects (cancelled losers): {local.disconnects}")
+
+    await router.close()
+    await local.stop()
+    await cloud.stop()
+
+
+async def serve(args):
+    server = StubModelServer(args.port, args.ttft, args.token_delay, args.tokens, args.error_rate)
+    await server.start()
+    print(f"Stub model server on {server.base_url}")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible model server")
+    parser.add_argument("--demo", action="store_true", help="Run the model router demo")
+    parser.add_argument("--port", type=int, default=4001)
+    parser.add_argument("--ttft", type=float, default=0.1)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(demo() if args.demo else serve(args))
+
+
+if __name__ == "__main__":
+    main()
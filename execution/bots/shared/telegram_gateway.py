@@ -11,9 +11,12 @@ This module provides:
 """
 
 import os
+import asyncio
 import logging
+from functools import partial
 from typing import Optional, Dict, List, Callable, Any
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, Forbidden
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -23,6 +26,16 @@ from telegram.ext import (
     ContextTypes
 )
 
+from broadcast import BroadcastEngine, BroadcastResult
+from callback_router import CallbackRouter, TTLCache
+from intent_router import Intent, IntentRouter
+from litellm_client import DEFAULT_CHAT_MODEL, LiteLLMClient
+from llm_stream import StreamingResponder
+from semantic_cache import SemanticCache
+from outbox import Outbox, bot_key
+from update_processor import ChatOrderedUpdateProcessor, HandlerStats
+from webhook_server import WebhookServer
+
 # Configure logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -58,7 +71,22 @@ class TelegramGateway:
         self.application: Optional[Application] = None
         self.command_handlers: Dict[str, Callable] = {}
         self.message_handler: Optional[Callable] = None
-        self.callback_handlers: Dict[str, Callable] = {}
+        self.intent_router: Optional[IntentRouter] = None
+        self.callback_router = CallbackRouter()
+        # Per-request state behind inline buttons (bounded: LRU + 24h TTL)
+        self.callback_state = TTLCache(
+            maxsize=int(os.getenv("TELEGRAM_CALLBACK_STATE_MAX", "10000")),
+            ttl=float(os.getenv("TELEGRAM_CALLBACK_STATE_TTL", "86400"))
+        )
+        self.broadcaster: Optional[BroadcastEngine] = None
+        self.outbox: Optional[Outbox] = None
+        self.responder: Optional[StreamingResponder] = None
+        self.llm: Optional[LiteLLMClient] = None
+        self.webhook_server: Optional[WebhookServer] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self.handler_stats = HandlerStats(
+            slow_threshold=float(os.getenv("TELEGRAM_SLOW_HANDLER_SECONDS", "2.0"))
+        )
 
         logger.info(f"Initialized {bot_name} gateway for {len(allowed_user_ids)} authorized user(s)")
 
@@ -127,12 +155,19 @@ class TelegramGateway:
         if not await self._check_authorization(update, context):
             return
 
+        slowest = list(self.handler_stats.summary().items())[:3]
+        latency = "".join(
+            f"• {name}: p95 {stats['p95_ms']:.0f}ms ({stats['count']} calls)\n"
+            for name, stats in slowest
+        )
+
         await update.message.reply_text(
             f"✅ {self.bot_name} Status\n\n"
             f"• Bot: Online\n"
             f"• Authorized users: {len(self.allowed_user_ids)}\n"
             f"• Your ID: {update.effective_user.id}\n\n"
-            "All systems operational!"
+            + (f"Slowest handlers:\n{latency}\n" if latency else "")
+            + "All systems operational!"
         )
 
 
@@ -143,10 +178,31 @@ class TelegramGateway:
 
         message_text = update.message.text
 
-        # If bot has a custom message handler, use it
-        if self.message_handler:
+        # Common questions are answered by intent handlers; the rest go to the
+        # custom message handler (typically the LLM)
+        handler = self.message_handler
+        kwargs = {}
+        if self.intent_router:
+            match = await self.intent_router.classify(message_text)
+            if match and match.intent.handler:
+                handler = partial(self.intent_router.answer, match)
+            elif match:
+                # Handler-less intent: the message handler answers, tagged with it
+                kwargs["intent"] = match.intent.name
+
+        if handler:
             try:
-                response = await self.message_handler(message_text, update, context)
+                response = handler(message_text, update, context, **kwargs)
+                if not hasattr(response, "__aiter__"):
+                    response = await response
+                if hasattr(response, "__aiter__"):
+                    # Async generator: stream tokens into an edited message
+                    await self.responder.respond(
+                        update.effective_chat.id,
+                        response,
+                        reply_to_message_id=update.message.message_id
+                    )
+                    return
                 if response:
                     await update.message.reply_text(response)
             except Exception as e:
@@ -176,10 +232,21 @@ class TelegramGateway:
 
         callback_data = query.data
 
-        # Route to registered callback handler
-        if callback_data in self.callback_handlers:
+        # Route to registered callback handler (exact or pattern match)
+        route = self.callback_router.resolve(callback_data)
+        if route:
+            handler, params = route
+            # Entries are (state, keys of every button sharing it); they are
+            # dropped only once the handler succeeds, so a failed press can
+            # be retried
+            entry = self.callback_state.get(callback_data)
+            if entry is not None:
+                params["state"] = entry[0]
             try:
-                response = await self.callback_handlers[callback_data](query, context)
+                response = await handler(query, context, **params)
+                if entry is not None:
+                    for key in entry[1]:
+                        self.callback_state.pop(key)
                 if response:
                     await query.edit_message_text(response)
             except Exception as e:
@@ -215,7 +282,8 @@ class TelegramGateway:
 
         Args:
             handler: Async function(message_text, update, context) -> str
-                     Should return response text or None
+                     Should return response text or None. May instead be an
+                     async generator (or return one) to stream its output.
 
         Example:
             async def handle_message(text, update, context):
@@ -229,26 +297,116 @@ class TelegramGateway:
         logger.info("Registered message handler for natural language processing")
 
 
+    def register_intent(self, intent: Intent):
+        """
+        Answer a common question directly instead of via the message handler
+
+        Args:
+            intent: Intent with keywords/patterns and/or example phrasings;
+                    with handler=None the LLM answers it, cached under the
+                    intent's SEMANTIC_CACHE_TTLS entry
+
+        Example:
+            gateway.register_intent(Intent(
+                name="urgent_tasks",
+                handler=list_urgent_tasks,
+                keywords=["urgent"],
+                examples=["Show me urgent tasks", "What needs doing today?"],
+            ))
+        """
+        if not self.intent_router:
+            self.intent_router = IntentRouter()
+        self.intent_router.add(intent)
+        logger.info(f"Registered intent: {intent.name}")
+
+
+    def enable_llm_chat(
+        self,
+        model: str = DEFAULT_CHAT_MODEL,
+        system_prompt: Optional[str] = None,
+        cache: Optional[SemanticCache] = None
+    ):
+        """
+        Answer natural language messages with a streamed LiteLLM reply
+
+        Args:
+            model: LiteLLM model alias (see litellm_config.yaml)
+            system_prompt: Optional system message prepended to every request
+            cache: Semantic cache for near-duplicate prompts (optional);
+                   hits are answered instantly without an LLM call. Answers
+                   are cached under the routed intent (a handler-less Intent)
+                   so SEMANTIC_CACHE_TTLS applies, else under "general"
+
+        Example:
+            gateway.enable_llm_chat("gpt-4o-mini", "You are SLED Commander...", cache=SemanticCache())
+        """
+        self.llm = self.llm or LiteLLMClient()
+        scope = cache.scope_for(model, system_prompt) if cache is not None else None
+
+        async def stream_and_cache(messages, text, vector, intent):
+            parts = []
+            async for token in self.llm.stream_chat(messages, model=model):
+                parts.append(token)
+                yield token
+            await cache.store(text, "".join(parts), scope, intent=intent, vector=vector)
+
+        async def handle_with_llm(text, update, context, intent="general"):
+            messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+            messages.append({"role": "user", "content": text})
+            if cache is None:   # an empty SemanticCache is falsy (__len__)
+                return self.llm.stream_chat(messages, model=model)
+
+            try:
+                hit = await cache.lookup(text, scope)
+            except Exception as e:
+                logger.warning(f"Semantic cache unavailable: {e}")
+                return self.llm.stream_chat(messages, model=model)
+            if hit.response is not None:
+                logger.info(f"Semantic cache hit (similarity {hit.score:.3f})")
+                return hit.response
+            return stream_and_cache(messages, text, hit.vector, intent)
+
+        self.register_message_handler(handle_with_llm)
+
+
     def register_callback(self, callback_data: str, handler: Callable):
         """
-        Register handler for inline keyboard button
+        Register handler for inline keyboard buttons
 
         Args:
-            callback_data: Unique identifier for this button action
-            handler: Async function(query, context) -> str
+            callback_data: Exact callback data, or a pattern with {name} /
+                           {name:int} placeholders matching many buttons
+            handler: Async function(query, context, **params) -> str
+                     Receives parsed placeholders as keyword arguments, plus
+                     state= if state was attached to the button.
                      Should return response text or None
 
         Example:
-            async def approve_quote(query, context):
+            async def approve_quote(query, context, quote_id, state=None):
                 # Process approval
-                return "✅ Quote approved and sent!"
+                return f"✅ Quote {quote_id} approved and sent!"
 
-            gateway.register_callback("approve_quote_12345", approve_quote)
+            gateway.register_callback("approve_quote_{quote_id:int}", approve_quote)
         """
-        self.callback_handlers[callback_data] = handler
+        self.callback_router.add(callback_data, handler)
         logger.info(f"Registered callback handler: {callback_data}")
 
 
+    def unregister_callback(self, callback_data: str):
+        """Remove a handler registered with register_callback"""
+        self.callback_router.remove(callback_data)
+
+
+    def get_handler_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-handler latency, slowest first
+
+        Returns:
+            {"/quote": {"count": 12, "errors": 0, "p50_ms": 85.0, "p95_ms": 910.2, "max_ms": 1204.7}, ...}
+        """
+        return self.handler_stats.summary()
+
+
     async def send_message(self, user_id: int, text: str, parse_mode: str = "Markdown"):
         """
         Send message to specific user
@@ -258,18 +416,61 @@ class TelegramGateway:
             text: Message text (supports Markdown by default)
             parse_mode: "Markdown" or "HTML" or None
 
+        Returns:
+            True if delivered now, False otherwise. Transient failures are
+            handed to the outbox and retried in the background.
+
         Example:
             await gateway.send_message(12345, "✅ Task completed!")
         """
         try:
-            await self.application.bot.send_message(
-                chat_id=user_id,
-                text=text,
-                parse_mode=parse_mode
-            )
+            # Goes through the broadcaster so 1:1 sends share the rate limits
+            await self.broadcaster.send(user_id, text, parse_mode=parse_mode)
             logger.info(f"Sent message to user {user_id}")
+            return True
+        except (Forbidden, BadRequest) as e:
+            logger.error(f"Failed to send message to user {user_id}: {e}")
+            return False
         except Exception as e:
             logger.error(f"Failed to send message to user {user_id}: {e}")
+            if self.outbox:
+                await self.outbox.put(user_id, text, parse_mode=parse_mode)
+                logger.info(f"Queued message to user {user_id} for retry")
+            return False
+
+
+    async def queue_message(
+        self,
+        user_id: int,
+        text: str,
+        parse_mode: str = "Markdown",
+        collapse_key: Optional[str] = None
+    ) -> int:
+        """
+        Queue message for background delivery (never waits on Telegram)
+
+        Args:
+            user_id: Telegram user ID
+            text: Message text
+            parse_mode: "Markdown" or "HTML" or None
+            collapse_key: Messages with the same key replace this user's
+                          still-pending one (e.g. "pipeline_status")
+
+        Example:
+            await gateway.queue_message(12345, "🔄 Sync 40% done", collapse_key="sync")
+        """
+        return await self.outbox.put(user_id, text, parse_mode=parse_mode, collapse_key=collapse_key)
+
+
+    async def queue_to_all_users(
+        self,
+        text: str,
+        parse_mode: str = "Markdown",
+        collapse_key: Optional[str] = None
+    ):
+        """Queue message for every authorized user (see queue_message)"""
+        for user_id in self.allowed_user_ids:
+            await self.queue_message(user_id, text, parse_mode, collapse_key)
 
 
     async def send_approval_request(
@@ -277,7 +478,8 @@ class TelegramGateway:
         user_id: int,
         message: str,
         approve_callback: str,
-        reject_callback: str
+        reject_callback: str,
+        state: Any = None
     ) -> None:
         """
         Send message with Approve/Reject buttons
@@ -287,6 +489,8 @@ class TelegramGateway:
             message: Description of what needs approval
             approve_callback: Callback data for approve button
             reject_callback: Callback data for reject button
+            state: Optional payload handed to whichever button's handler
+                   runs (as state=); expires with callback_state's TTL
 
         Example:
             await gateway.send_approval_request(
@@ -304,10 +508,16 @@ class TelegramGateway:
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
 
+        if state is not None:
+            # Approve and reject share one state; answering either drops both
+            entry = (state, (approve_callback, reject_callback))
+            self.callback_state.set(approve_callback, entry)
+            self.callback_state.set(reject_callback, entry)
+
         try:
-            await self.application.bot.send_message(
-                chat_id=user_id,
-                text=message,
+            await self.broadcaster.send(
+                user_id,
+                message,
                 reply_markup=reply_markup,
                 parse_mode="Markdown"
             )
@@ -316,19 +526,27 @@ class TelegramGateway:
             logger.error(f"Failed to send approval request to user {user_id}: {e}")
 
 
-    async def send_to_all_users(self, text: str, parse_mode: str = "Markdown"):
+    async def send_to_all_users(self, text: str, parse_mode: str = "Markdown") -> BroadcastResult:
         """
         Broadcast message to all authorized users
 
+        Sends concurrently within Telegram's global (30 msg/s) and per-chat
+        (1 msg/s) limits, waiting out any 429 retry_after.
+
         Args:
             text: Message text
             parse_mode: "Markdown" or "HTML" or None
 
+        Returns:
+            BroadcastResult with delivered/failed counts
+
         Example:
-            await gateway.send_to_all_users("🚨 System alert: High CPU usage detected!")
+            result = await gateway.send_to_all_users("🚨 System alert: High CPU usage detected!")
         """
-        for user_id in self.allowed_user_ids:
-            await self.send_message(user_id, text, parse_mode)
+        result = await self.broadcaster.broadcast(self.allowed_user_ids, text, parse_mode=parse_mode)
+        log = logger.warning if result.failed else logger.info
+        log(f"Broadcast delivered to {result.delivered} user(s), {result.failed} failed")
+        return result
 
 
     def build_application(self) -> Application:
@@ -338,45 +556,93 @@ class TelegramGateway:
         Returns:
             Application instance ready to run
         """
-        self.application = Application.builder().token(self.bot_token).build()
+        self.application = (
+            Application.builder()
+            .token(self.bot_token)
+            .base_url(os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot"))
+            .concurrent_updates(ChatOrderedUpdateProcessor(
+                int(os.getenv("TELEGRAM_CONCURRENT_UPDATES", "32"))
+            ))
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
+        self.broadcaster = BroadcastEngine(self.application.bot.send_message)
+        self.outbox = Outbox(bot_key(self.bot_token))
+        self.responder = StreamingResponder(self.application.bot)
+
+        # Every handler is timed so slow commands show up in /status
+        timed = self.handler_stats.timed
 
         # Add built-in command handlers
-        self.application.add_handler(CommandHandler("start", self._handle_start))
-        self.application.add_handler(CommandHandler("help", self._handle_help))
-        self.application.add_handler(CommandHandler("status", self._handle_status))
+        self.application.add_handler(CommandHandler("start", timed("/start", self._handle_start)))
+        self.application.add_handler(CommandHandler("help", timed("/help", self._handle_help)))
+        self.application.add_handler(CommandHandler("status", timed("/status", self._handle_status)))
 
         # Add custom command handlers
         for command, handler in self.command_handlers.items():
-            self.application.add_handler(CommandHandler(command, handler))
+            self.application.add_handler(CommandHandler(command, timed(f"/{command}", handler)))
 
         # Add message handler (natural language)
         self.application.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message)
+            MessageHandler(filters.TEXT & ~filters.COMMAND, timed("message", self._handle_message))
         )
 
         # Add callback query handler (inline keyboard buttons)
-        self.application.add_handler(CallbackQueryHandler(self._handle_callback))
+        self.application.add_handler(CallbackQueryHandler(timed("callback", self._handle_callback)))
 
         logger.info(f"{self.bot_name} application built with {len(self.command_handlers)} custom commands")
 
         return self.application
 
 
-    async def start(self):
-        """Start the bot (runs forever until stopped)"""
+    async def _post_init(self, application: Application):
+        """Start delivering queued messages once the bot is running"""
+        self.outbox.start(self.broadcaster, application.bot)
+
+
+    async def _post_shutdown(self, application: Application):
+        await self.outbox.stop()
+        if self.llm:
+            await self.llm.close()
+
+
+    async def start(self, webhook_server: Optional[WebhookServer] = None):
+        """
+        Start the bot (runs forever until stopped)
+
+        Receives updates by webhook when a server is passed in or
+        TELEGRAM_WEBHOOK_URL is set, otherwise falls back to long polling.
+
+        Args:
+            webhook_server: Shared server to host this bot on (optional)
+        """
         if not self.application:
             self.build_application()
 
         logger.info(f"Starting {self.bot_name}...")
 
+        if webhook_server is None and os.getenv("TELEGRAM_WEBHOOK_URL"):
+            webhook_server = WebhookServer.from_env()
+
+        self._stopped = asyncio.Event()
+        if webhook_server:
+            self.webhook_server = webhook_server
+            webhook_server.add_gateway(self)
+            await webhook_server.start()
+        else:
+            await self.application.initialize()
+            await self._post_init(self.application)
+            await self.application.start()
+            await self.application.updater.start_polling()
+
         # Send startup notification to all users
         await self.send_to_all_users(
             f"🟢 *{self.bot_name} Online*\n\n"
             f"I'm ready to help! Send /help to see what I can do."
         )
 
-        # Start polling
-        await self.application.run_polling()
+        await self._stopped.wait()
 
 
     async def stop(self):
@@ -389,8 +655,17 @@ class TelegramGateway:
             f"Going offline for maintenance. I'll be back soon!"
         )
 
-        if self.application:
+        if self.webhook_server:
+            # Other bots may share the server; only take this one down
+            await self.webhook_server.stop_bot(self.bot_name)
+        elif self.application and self.application.running:
+            await self.application.updater.stop()
             await self.application.stop()
+            await self.application.shutdown()
+            await self._post_shutdown(self.application)
+
+        if self._stopped:
+            self._stopped.set()
 
 
 # Utility functions for common message formatting
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Update Processor - Concurrent update handling with per-chat ordering
+
+python-telegram-bot runs handlers one update at a time unless told otherwise,
+so one slow LLM call stalls every user. This module provides:
+- ChatOrderedUpdateProcessor: runs up to N updates at once, but updates from
+  the same chat still run strictly in arrival order
+- HandlerStats: rolling latency/error stats per handler, to spot slow commands
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_UPDATES = 32
+LATENCY_WINDOW = 500
+
+
+def _chat_key(update: object) -> Optional[int]:
+    if isinstance(update, Update) and update.effective_chat:
+        return update.effective_chat.id
+    return None
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Bounded concurrent update processing, serialized per chat
+
+    A chat's update waits for that chat's previous update *before* taking a
+    worker slot, so a burst from one chat never starves everyone else.
+
+    Example:
+        Application.builder().token(token).concurrent_updates(
+            ChatOrderedUpdateProcessor(32)
+        ).build()
+    """
+
+    def __init__(self, max_concurrent_updates: int = DEFAULT_MAX_CONCURRENT_UPDATES):
+        super().__init__(max_concurrent_updates)
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+        self._chat_waiting: Dict[int, int] = {}
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat_id = _chat_key(update)
+        if chat_id is None:
+            await super().process_update(update, coroutine)
+            return
+
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        self._chat_waiting[chat_id] = self._chat_waiting.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                await super().process_update(update, coroutine)
+        finally:
+            self._chat_waiting[chat_id] -= 1
+            if not self._chat_waiting[chat_id]:
+                # Last update for this chat; drop its lock so memory stays flat
+                del self._chat_waiting[chat_id]
+                del self._chat_locks[chat_id]
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @property
+    def active_chats(self) -> int:
+        """Chats with an update running or waiting"""
+        return len(self._chat_locks)
+
+
+class HandlerStats:
+    """
+    Rolling latency and error counts per handler
+
+    Example:
+        stats = HandlerStats(slow_threshold=1.0)
+        handler = stats.timed("/quote", handle_quote)
+        ...
+        stats.summary()   # {"/quote": {"count": 12, "p50_ms": ..., "p95_ms": ...}}
+    """
+
+    def __init__(self, slow_threshold: float = 1.0, window: int = LATENCY_WINDOW):
+        self.slow_threshold = slow_threshold
+        self.window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float, error: bool = False):
+        self._latencies.setdefault(name, deque(maxlen=self.window)).append(seconds)
+        self._counts[name] = self._counts.get(name, 0) + 1
+        if error:
+            self._errors[name] = self._errors.get(name, 0) + 1
+        if seconds > self.slow_threshold:
+            logger.warning(f"Slow handler {name}: {seconds * 1000:.0f}ms")
+
+    def timed(self, name: str, handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Wrap an async handler so every call is recorded under name"""
+        @wraps(handler)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = False
+            try:
+                return await handler(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                self.record(name, time.perf_counter() - started, error)
+        return wrapper
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-handler count, errors and p50/p95/max latency (ms), slowest first"""
+        result = {}
+        for name, samples in self._latencies.items():
+            ordered = sorted(samples)
+            result[name] = {
+                "count": self._counts[name],
+                "errors": self._errors.get(name, 0),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return dict(sorted(result.items(), key=lambda item: item[1]["p95_ms"], reverse=True))
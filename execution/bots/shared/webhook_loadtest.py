@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Webhook Load Test - Drive the webhook server with synthetic updates, fully offline
+
+Starts three things in one process:
+1. A fake Telegram Bot API (answers getMe/setWebhook/sendMessage locally)
+2. A WebhookServer hosting N gateways pointed at the fake API
+3. A load generator posting synthetic message updates to each bot's secret path
+
+Reports webhook ack latency and end-to-end throughput (update posted ->
+reply received by the fake API).
+
+Usage:
+    python3 webhook_loadtest.py --bots 3 --updates 2000 --chats 50 --handler-delay 0.05
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from aiohttp import ClientSession, web
+
+from webhook_server import SECRET_HEADER, WebhookServer
+
+logger = logging.getLogger(__name__)
+
+
+class FakeBotAPI:
+    """Minimal stand-in for api.telegram.org"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8081):
+        self.host = host
+        self.port = port
+        self.sent = 0
+        self.reply_event = asyncio.Event()
+        self.expected = 0
+        self._message_ids = itertools.count(1)
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/bot"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        token = request.match_info["token"]
+        if method == "getMe":
+            bot_id = int(token.split(":")[0])
+            result = {"id": bot_id, "is_bot": True, "first_name": f"LoadBot{bot_id}", "username": f"load{bot_id}_bot"}
+        elif method == "sendMessage":
+            data = await request.post()
+            self.sent += 1
+            if self.sent >= self.expected:
+                self.reply_event.set()
+            result = {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": int(data["chat_id"]), "type": "private"},
+                "text": data.get("text", ""),
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+def synthetic_update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": f"User{chat_id}"},
+            "text": text,
+        },
+    }
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_load_test(args) -> dict:
+    os.environ.setdefault("TELEGRAM_OUTBOX_PATH", os.path.join(tempfile.mkdtemp(), "outbox.db"))
+    from telegram_gateway import TelegramGateway
+
+    fake_api = FakeBotAPI(port=args.api_port)
+    os.environ["TELEGRAM_API_BASE_URL"] = fake_api.base_url
+    await fake_api.start()
+
+    chat_ids = list(range(10_000, 10_000 + args.chats))
+
+    async def slow_handler(text, update, context):
+        await asyncio.sleep(args.handler_delay)
+        return f"Handled: {text}"
+
+    server = WebhookServer(host="127.0.0.1", port=args.port)
+    routes = []
+    for i in range(args.bots):
+        gateway = TelegramGateway(f"{900000 + i}:LOADTEST", chat_ids, bot_name=f"Load Bot {i}")
+        gateway.register_message_handler(slow_handler)
+        routes.append(server.add_gateway(gateway))
+    await server.start()
+
+    fake_api.expected = args.updates
+    ack_latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    base = f"http://127.0.0.1:{args.port}"
+
+    async def post(session, update_id):
+        route = routes[update_id % len(routes)]
+        chat_id = chat_ids[update_id % len(chat_ids)]
+        async with semaphore:
+            started = time.perf_counter()
+            async with session.post(
+                f"{base}{route.path}",
+                json=synthetic_update(update_id, chat_id, f"msg {update_id}"),
+                headers={SECRET_HEADER: route.secret_token},
+            ) as response:
+                response.raise_for_status()
+            ack_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with ClientSession() as session:
+        await asyncio.gather(*(post(session, i) for i in range(args.updates)))
+        posted = time.perf_counter() - started
+        try:
+            await asyncio.wait_for(fake_api.reply_event.wait(), timeout=args.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out with {fake_api.sent}/{args.updates} replies")
+    elapsed = time.perf_counter() - started
+
+    await server.stop()
+    await fake_api.stop()
+
+    return {
+        "updates": args.updates,
+        "replies": fake_api.sent,
+        "post_seconds": round(posted, 3),
+        "total_seconds": round(elapsed, 3),
+        "updates_per_second": round(fake_api.sent / elapsed, 1),
+        "ack_p50_ms": round(statistics.median(ack_latencies) * 1000, 2),
+        "ack_p95_ms": round(percentile(ack_latencies, 0.95) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the webhook server")
+    parser.add_argument("--bots", type=int, default=3)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50, help="In-flight webhook POSTs")
+    parser.add_argument("--handler-delay", type=float, default=0.05, help="Simulated handler work (seconds)")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--api-port", type=int, default=8081)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run_load_test(args))
+
+    print("\n📊 Webhook load test")
+    for key, value in results.items():
+        print(f"  • {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
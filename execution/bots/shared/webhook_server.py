@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Webhook Server - Receive Telegram updates over HTTPS instead of long polling
+
+One aiohttp server hosts any number of bots on a single port:
+- Each bot gets its own secret path (/telegram/<bot>/<secret>)
+- Requests must also carry Telegram's X-Telegram-Bot-Api-Secret-Token header
+- Updates are acknowledged immediately and handed to the bot's update queue,
+  so slow handlers never hold up Telegram's delivery
+
+Usage (all three bots on one port):
+    export TELEGRAM_WEBHOOK_URL=https://apex.example.com
+    export TELEGRAM_WEBHOOK_SECRET=<long random string>
+    python3 webhook_server.py
+
+Environment:
+    TELEGRAM_WEBHOOK_URL     Public base URL Telegram posts to (required to register)
+    TELEGRAM_WEBHOOK_HOST    Listen address (default: 0.0.0.0)
+    TELEGRAM_WEBHOOK_PORT    Listen port (default: 8443)
+    TELEGRAM_WEBHOOK_SECRET  Derives stable per-bot paths/tokens (random per run if unset)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+DEFAULT_PORT = 8443
+DEFAULT_MAX_CONNECTIONS = 40
+
+
+@dataclass
+class WebhookRoute:
+    """A bot hosted on the server"""
+    name: str
+    application: Application
+    path_secret: str
+    secret_token: str
+    received: int = 0
+    rejected: int = 0
+    started: bool = False
+
+    @property
+    def path(self) -> str:
+        return f"/telegram/{self.name}/{self.path_secret}"
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "bot"
+
+
+class WebhookServer:
+    """
+    Hosts several Telegram bots behind one aiohttp listener
+
+    Example:
+        server = WebhookServer.from_env()
+        server.add_gateway(sled_gateway)
+        server.add_gateway(warden_gateway)
+        await server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = DEFAULT_PORT,
+        public_url: Optional[str] = None,
+        secret: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ):
+        """
+        Args:
+            host: Listen address
+            port: Listen port
+            public_url: Base URL Telegram can reach; webhooks are only
+                        registered with Telegram when this is set
+            secret: Master secret for deriving per-bot paths and tokens
+            max_connections: Concurrent connections Telegram may open per bot
+        """
+        self.host = host
+        self.port = port
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.secret = secret or secrets.token_urlsafe(32)
+        self.max_connections = max_connections
+        self.routes: Dict[str, WebhookRoute] = {}
+        self.web_app = web.Application()
+        self.web_app.router.add_post("/telegram/{name}/{secret}", self._handle_update)
+        self.web_app.router.add_get("/healthz", self._handle_health)
+        self._runner: Optional[web.AppRunner] = None
+
+    @classmethod
+    def from_env(cls) -> "WebhookServer":
+        return cls(
+            host=os.getenv("TELEGRAM_WEBHOOK_HOST", "0.0.0.0"),
+            port=int(os.getenv("TELEGRAM_WEBHOOK_PORT", DEFAULT_PORT)),
+            public_url=os.getenv("TELEGRAM_WEBHOOK_URL"),
+            secret=os.getenv("TELEGRAM_WEBHOOK_SECRET"),
+        )
+
+    def _derive(self, name: str, purpose: str) -> str:
+        digest = hmac.new(self.secret.encode(), f"{name}:{purpose}".encode(), hashlib.sha256)
+        return digest.hexdigest()[:48]
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def add_bot(self, name: str, application: Application) -> WebhookRoute:
+        """
+        Host a python-telegram-bot Application
+
+        Args:
+            name: Bot name (slugified into the URL path)
+            application: Built Application (not yet initialized)
+
+        Returns:
+            The route, including the secret path to post updates to
+        """
+        name = _slug(name)
+        if name in self.routes:
+            if self.routes[name].application is application:
+                return self.routes[name]
+            raise ValueError(f"Bot '{name}' is already registered")
+        route = WebhookRoute(
+            name=name,
+            application=application,
+            path_secret=self._derive(name, "path"),
+            secret_token=self._derive(name, "token"),
+        )
+        self.routes[name] = route
+        logger.info(f"Webhook route registered for {name}")
+        return route
+
+    def add_gateway(self, gateway) -> WebhookRoute:
+        """Host a TelegramGateway (builds its application if needed)"""
+        if not gateway.application:
+            gateway.build_application()
+        return self.add_bot(gateway.bot_name, gateway.application)
+
+    # ------------------------------------------------------------------
+    # HTTP handlers
+    # ------------------------------------------------------------------
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        route = self.routes.get(request.match_info["name"])
+        if route is None or not hmac.compare_digest(request.match_info["secret"], route.path_secret):
+            return web.Response(status=404)
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), route.secret_token):
+            route.rejected += 1
+            logger.warning(f"Rejected webhook call for {route.name}: bad secret token")
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+            update = Update.de_json(data, route.application.bot)
+        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            route.rejected += 1
+            logger.warning(f"Malformed update for {route.name}: {e}")
+            return web.Response(status=400)
+
+        # Ack straight away; the application processes the queue concurrently
+        await route.application.update_queue.put(update)
+        route.received += 1
+        return web.Response()
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            name: {
+                "running": route.application.running,
+                "received": route.received,
+                "rejected": route.rejected,
+                "queued": route.application.update_queue.qsize(),
+            }
+            for name, route in self.routes.items()
+        })
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def _start_route(self, route: WebhookRoute):
+        app = route.application
+        await app.initialize()
+        if app.post_init:
+            await app.post_init(app)
+        await app.start()
+        route.started = True
+
+        if self.public_url:
+            await app.bot.set_webhook(
+                url=f"{self.public_url}{route.path}",
+                secret_token=route.secret_token,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=self.max_connections,
+            )
+            logger.info(f"Webhook set for {route.name}")
+
+    async def _stop_route(self, route: WebhookRoute):
+        app = route.application
+        route.started = False
+        if app.running:
+            await app.stop()
+            if app.post_stop:
+                await app.post_stop(app)
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+
+    async def start(self):
+        """
+        Start bots not yet running, register their webhooks, and listen
+
+        Safe to call again after adding more bots (e.g. each gateway's
+        start() on a shared server): running bots are left alone and the
+        port is only bound once.
+        """
+        for route in self.routes.values():
+            if not route.started:
+                await self._start_route(route)
+
+        if self._runner is None:
+            self._runner = web.AppRunner(self.web_app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, self.host, self.port).start()
+            logger.info(f"Webhook server listening on {self.host}:{self.port}")
+        logger.info(f"Webhook server hosting {len(self.routes)} bot(s)")
+
+    async def stop_bot(self, name: str):
+        """Shut one bot down; stops listening once no bot is left running"""
+        route = self.routes.get(_slug(name))
+        if route and route.started:
+            await self._stop_route(route)
+        if not any(route.started for route in self.routes.values()):
+            await self.stop()
+
+    async def stop(self):
+        """Stop listening, then shut every bot down (webhooks stay registered)"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+        for route in self.routes.values():
+            if route.started:
+                await self._stop_route(route)
+        logger.info("Webhook server stopped")
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+
+async def main():
+    """Host SLED Commander, TatT Architect and Security Warden on one port"""
+    from telegram_gateway import TelegramGateway
+
+    allowed = [int(u) for u in os.getenv("TELEGRAM_USER_ID", "").split(",") if u]
+    bots = {
+        "SLED Commander": os.getenv("TELEGRAM_BOT_TOKEN_SLED"),
+        "TatT Architect": os.getenv("TELEGRAM_BOT_TOKEN_TATT"),
+        "Security Warden": os.getenv("TELEGRAM_BOT_TOKEN_WARDEN"),
+    }
+
+    server = WebhookServer.from_env()
+    for name, token in bots.items():
+        if token:
+            server.add_gateway(TelegramGateway(token, allowed, bot_name=name))
+        else:
+            logger.warning(f"No token for {name}, skipping")
+
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    asyncio.run(main())
@@ -5,6 +5,11 @@ import sqlite3
 import sys
 from pathlib import Path
 
+# Schema lives in bots/database/migrations
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "bots"))
+
+from database.db_manager import apply_migrations
+
 
 def resolve_db_path(raw_path: str) -> Path:
     expanded = os.path.expandvars(os.path.expanduser(raw_path))
@@ -21,7 +26,7 @@ def ensure_parent_dir(db_path: Path) -> None:
         ) from exc
 
 
-def init_db(db_path: Path) -> str:
+def init_db(db_path: Path) -> tuple[str, list[str]]:
     ensure_parent_dir(db_path)
     conn = sqlite3.connect(str(db_path))
     try:
@@ -29,19 +34,8 @@ def init_db(db_path: Path) -> str:
         mode = cursor.fetchone()[0]
         if str(mode).lower() != "wal":
             raise RuntimeError(f"Expected WAL mode, got '{mode}'")
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS apex_meta (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            "INSERT OR IGNORE INTO apex_meta (key, value) VALUES ('schema_version', '1')"
-        )
-        conn.commit()
-        return mode
+        applied = apply_migrations(conn)
+        return mode, applied
     finally:
         conn.close()
 
@@ -63,13 +57,14 @@ def main() -> int:
     args = parse_args()
     db_path = resolve_db_path(args.db_path)
     try:
-        mode = init_db(db_path)
+        mode, applied = init_db(db_path)
     except Exception as exc:
         print(f"[init_db] ERROR: {exc}", file=sys.stderr)
         return 1
 
     print(f"[init_db] SQLite initialized at {db_path}")
     print(f"[init_db] journal_mode={mode}")
+    print(f"[init_db] applied migrations: {', '.join(applied) or 'none (up to date)'}")
     return 0
 
 